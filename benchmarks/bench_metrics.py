@@ -0,0 +1,54 @@
+"""Time metrics-only triage of a directory of AlphaFold 2 pickles.
+
+Usage: ``python benchmarks/bench_metrics.py --models 1000 --residues 300``
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import pickle
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from alphapickle import AlphaPickleRunner
+from alphapickle.metrics import write_json_lines
+
+
+def _write_models(directory: Path, n_models: int, n_residues: int) -> None:
+    rng = np.random.default_rng(0)
+    names = [f"model_{i}" for i in range(n_models)]
+    with open(directory / "ranking_debug.json", "w") as fh:
+        json.dump({"order": names}, fh)
+    for name in names:
+        data = {
+            "plddt": rng.uniform(0, 100, n_residues),
+            "predicted_aligned_error": rng.uniform(0, 32, (n_residues, n_residues)).astype(np.float32),
+            "ptm": rng.uniform(),
+            "ranking_confidence": rng.uniform(0, 100),
+        }
+        with open(directory / f"result_{name}.pkl", "wb") as fh:
+            pickle.dump(data, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", type=int, default=1000)
+    parser.add_argument("--residues", type=int, default=300)
+    parser.add_argument("--jobs", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_models(Path(tmp), args.models, args.residues)
+        runner = AlphaPickleRunner(n_jobs=args.jobs)
+        start = time.perf_counter()
+        count = write_json_lines(runner.summarise_directory(tmp), io.StringIO())
+        elapsed = time.perf_counter() - start
+    print(f"{count} models, N={args.residues}: {elapsed:.2f} s ({elapsed / count * 1000:.2f} ms/model)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Compare probing an AlphaFold 2 pickle with loading it in full.
+
+Usage: ``python benchmarks/bench_probe.py --residues 1000 --repeats 5``
+"""
+from __future__ import annotations
+
+import argparse
+import pickle
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from alphapickle import AlphaFoldPickle, probe_file
+
+
+def _write_pickle(path: Path, n_residues: int) -> None:
+    data = {
+        "distogram": {"logits": np.zeros((n_residues, n_residues, 64), dtype=np.float32)},
+        "aligned_confidence_probs": np.zeros((n_residues, n_residues, 64), dtype=np.float32),
+        "plddt": np.zeros(n_residues),
+        "predicted_aligned_error": np.zeros((n_residues, n_residues)),
+        "ptm": np.float64(0.5),
+        "ranking_confidence": 0.5,
+    }
+    with open(path, "wb") as fh:
+        pickle.dump(data, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _time(func, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--residues", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "result_model_1.pkl"
+        _write_pickle(path, args.residues)
+        print(f"N={args.residues}, {path.stat().st_size / 2**20:.0f} MiB pickle")
+        print(f"probe    {_time(lambda: probe_file(path), args.repeats) * 1000:9.2f} ms")
+        print(f"full     {_time(lambda: AlphaFoldPickle(path), args.repeats) * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Report memory per loaded model for full objects and compact records.
+
+Usage: ``python benchmarks/bench_records.py --models 50 --residues 1000``
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import pickle
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from alphapickle import AlphaFoldPickle
+
+CONFIGS = [
+    ("record float32/float32", {"pae_dtype": "float32", "plddt_dtype": "float32"}),
+    ("record float16/float32", {"pae_dtype": "float16", "plddt_dtype": "float32"}),
+    ("record float16/uint8", {"pae_dtype": "float16", "plddt_dtype": "uint8"}),
+]
+
+
+def _write_models(directory: Path, n_models: int, n_residues: int) -> list[Path]:
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(n_models):
+        path = directory / f"result_model_{i}.pkl"
+        with open(path, "wb") as fh:
+            pickle.dump(
+                {
+                    "plddt": rng.uniform(0, 100, n_residues),
+                    "predicted_aligned_error": rng.uniform(0, 32, (n_residues, n_residues)),
+                },
+                fh,
+            )
+        paths.append(path)
+    return paths
+
+
+def _measure(load, paths: list[Path]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    held = [load(path) for path in paths]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return current / len(paths)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", type=int, default=20)
+    parser.add_argument("--residues", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = _write_models(Path(tmp), args.models, args.residues)
+        rows = [("AlphaFoldPickle", _measure(AlphaFoldPickle, paths))]
+        for label, kwargs in CONFIGS:
+            rows.append((label, _measure(lambda p, kw=kwargs: AlphaFoldPickle(p).to_record(**kw), paths)))
+
+    print(f"{args.models} models, {args.residues} residues")
+    for label, per_model in rows:
+        print(f"{label:<24} {per_model / 2**20:10.2f} MiB/model")
+
+
+if __name__ == "__main__":
+    main()
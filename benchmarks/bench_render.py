@@ -0,0 +1,60 @@
+"""Benchmark rendering: pLDDT styles on a long sequence, and per-model cost in a batch.
+
+Usage: ``python benchmarks/bench_render.py --residues 20000 --batch 100``
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from alphapickle.plotting import clear_templates, render_pae, render_plddt
+
+
+def _plddt(n_residues: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return np.clip(70 + np.cumsum(rng.normal(0, 2, n_residues)) % 60 - 30 + rng.normal(0, 5, n_residues), 0, 100)
+
+
+def _batch(directory: Path, n_models: int, n_residues: int, reuse: bool) -> float:
+    rng = np.random.default_rng(1)
+    models = [(_plddt(n_residues), rng.uniform(0, 32, (n_residues, n_residues))) for _ in range(n_models)]
+    clear_templates()
+    start = time.perf_counter()
+    for index, (plddt, pae) in enumerate(models):
+        if not reuse:
+            clear_templates()
+        render_plddt(plddt, directory / f"{index}_pLDDT.png", 12, 100)
+        render_pae(pae, directory / f"{index}_PAE.png", 12, 100)
+    return (time.perf_counter() - start) / n_models
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--residues", type=int, default=20000)
+    parser.add_argument("--size", type=float, default=12)
+    parser.add_argument("--batch", type=int, default=100, help="Models in the batch benchmark")
+    parser.add_argument("--batch-residues", type=int, default=300)
+    args = parser.parse_args()
+
+    plddt = _plddt(args.residues)
+    print(f"pLDDT trace of {args.residues} residues")
+    with tempfile.TemporaryDirectory() as tmp:
+        for style in ("scatter", "line"):
+            outfile = Path(tmp) / f"{style}.png"
+            start = time.perf_counter()
+            render_plddt(plddt, outfile, args.size, 1000, style=style)
+            elapsed = time.perf_counter() - start
+            print(f"{style:<8} {elapsed:7.2f} s  {outfile.stat().st_size / 2**10:9.1f} KiB")
+
+        print(f"\n{args.batch} models of {args.batch_residues} residues, pLDDT + PAE plot per model")
+        for label, reuse in (("fresh", False), ("template", True)):
+            per_model = _batch(Path(tmp), args.batch, args.batch_residues, reuse)
+            print(f"{label:<8} {per_model * 1000:7.1f} ms/model")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Time batch processing of AlphaFold 2 pickles with and without shared memory.
+
+Each pickle carries the full raw payload (distogram logits and aligned
+confidence probabilities as well as pLDDT and PAE), so the pickled variant
+pays for sending every result back through the worker pipes. At the default
+N=3000 each model is about 4.7 GB on disk; lower ``--residues`` on small
+machines.
+
+Usage: ``python benchmarks/bench_transport.py --models 4 --residues 3000 --jobs 4``
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import pickle
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from alphapickle import AlphaPickleRunner
+
+
+def _write_models(directory: Path, n_models: int, n_residues: int) -> None:
+    rng = np.random.default_rng(0)
+    names = [f"model_{i}" for i in range(n_models)]
+    with open(directory / "ranking_debug.json", "w") as fh:
+        json.dump({"order": names}, fh)
+    for name in names:
+        data = {
+            "distogram": {
+                "bin_edges": np.linspace(2.3, 21.7, 63),
+                "logits": rng.standard_normal((n_residues, n_residues, 64), dtype=np.float32),
+            },
+            "aligned_confidence_probs": rng.uniform(0, 1, (n_residues, n_residues, 64)).astype(np.float32),
+            "plddt": rng.uniform(0, 100, n_residues),
+            "predicted_aligned_error": rng.uniform(0, 32, (n_residues, n_residues)),
+            "ptm": np.float64(rng.uniform()),
+            "ranking_confidence": rng.uniform(0, 100),
+        }
+        with open(directory / f"result_{name}.pkl", "wb") as fh:
+            pickle.dump(data, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _run(label: str, directory: Path, n_jobs: int, share_memory: bool) -> None:
+    runner = AlphaPickleRunner(n_jobs=n_jobs, plot_size=2, axis_label_increment=500, share_memory=share_memory)
+    start = time.perf_counter()
+    results = runner.process_directory(directory)
+    checksum = sum(float(obj.data[0]["distogram"]["logits"][::97, ::97].sum()) for obj in results)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {len(results) / elapsed:8.3f} models/s  ({elapsed:.2f} s, checksum {checksum:.0f})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", type=int, default=4)
+    parser.add_argument("--residues", type=int, default=3000)
+    parser.add_argument("--jobs", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        _write_models(directory, args.models, args.residues)
+        size = sum(path.stat().st_size for path in directory.glob("*.pkl")) / args.models / 2**20
+        print(f"{args.models} models, N={args.residues} ({size:.0f} MiB each), {args.jobs} workers")
+        _run("pickled", directory, args.jobs, share_memory=False)
+        _run("shared", directory, args.jobs, share_memory=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,33 @@
 """AlphaPickle package."""
 from alphapickle.metadata import (
+    AlphaFold3Confidences,
     AlphaFoldJson,
     AlphaFoldMetaData,
+    AlphaFoldNpz,
     AlphaFoldPAEJson,
     AlphaFoldPDB,
     AlphaFoldPickle,
+    ColabFoldScores,
+    detect_layout,
+    ranked_models,
 )
+from alphapickle.probe import probe_file
+from alphapickle.records import ModelRecord
 from alphapickle.runner import AlphaPickleRunner
 
 __all__ = [
+    "AlphaFold3Confidences",
     "AlphaFoldJson",
     "AlphaFoldMetaData",
+    "AlphaFoldNpz",
     "AlphaFoldPAEJson",
     "AlphaFoldPDB",
     "AlphaFoldPickle",
     "AlphaPickleRunner",
+    "ColabFoldScores",
+    "ModelRecord",
+    "detect_layout",
+    "probe_file",
+    "ranked_models",
 ]
 
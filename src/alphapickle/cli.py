@@ -1,9 +1,14 @@
 """Command line interface for AlphaPickle."""
 from __future__ import annotations
 import argparse
+import os
+import sys
 from typing import Sequence
 
-from alphapickle import AlphaPickleRunner
+from alphapickle import AlphaFoldPAEJson, AlphaFoldPDB, AlphaFoldPickle, AlphaPickleRunner
+from alphapickle.metrics import summarise, write_json_lines
+from alphapickle.probe import probe_file
+from alphapickle.shards import build_inventory, merge_shards, parse_shard, write_inventory
 
 
 #
@@ -57,7 +62,7 @@ def main(argv: Sequence[str] | None = None) -> None:
     parser.add_argument(
         "-od",
         "--output_directory",
-        help="Path to AlphaFold output directory",
+        help="Path to AlphaFold 2, AlphaFold 3 or ColabFold output directory (layout is detected automatically)",
         default=None,
     )
     parser.add_argument(
@@ -107,34 +112,198 @@ def main(argv: Sequence[str] | None = None) -> None:
         default=100,
         type=int,
     )
+    parser.add_argument(
+        "-st",
+        "--plddt_style",
+        help=(
+            "Optional (Default = scatter). Draw pLDDT as one marker per residue (scatter) or as a "
+            "colour-mapped line (line), which is much faster for very long sequences"
+        ),
+        choices=["scatter", "line"],
+        default="scatter",
+    )
+    parser.add_argument(
+        "-pt",
+        "--pae_tiles",
+        help=(
+            "Optional. Also export PAE as a multi-resolution tile pyramid for interactive viewers, "
+            "written as a directory of tiles (dir) or a single archive (zip)"
+        ),
+        choices=["dir", "zip"],
+        default=None,
+    )
+    parser.add_argument(
+        "-bm",
+        "--batch_mode",
+        help=(
+            "Optional. When processing an output directory, draw all ranked pLDDT traces in one figure "
+            "(overlay or grid of small multiples) and write a single combined pLDDT csv"
+        ),
+        choices=["overlay", "grid"],
+        default=None,
+    )
+    parser.add_argument(
+        "-bin",
+        "--binary_metrics",
+        help=(
+            "Optional. Also save pLDDT and PAE to a compact quantised .npz file "
+            "(uint8 pLDDT, uint16 PAE) for archiving and fast reloading"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "-nj",
+        "--n_jobs",
+        help=(
+            "Optional. Maximum number of models processed in parallel for an output directory "
+            "(Default = 1, or the number of CPUs when --memory_budget is given)"
+        ),
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "-mb",
+        "--memory_budget",
+        help=(
+            "Optional. Memory available to parallel workers, e.g. 16G. Models are admitted according to "
+            "their estimated peak memory so that concurrency adapts to model size, up to --n_jobs workers"
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "-shm",
+        "--shared_memory",
+        help=(
+            "Optional. Hand arrays back from parallel workers through memory-mapped scratch files "
+            "(on /dev/shm where available) instead of pickling them"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--shard",
+        help=(
+            "Optional. Process shard i/N (zero-based) of all result directories found below "
+            "--output_directory, e.g. from a cluster job array, and write an index fragment"
+        ),
+        type=parse_shard,
+        default=None,
+    )
+    parser.add_argument(
+        "-ms",
+        "--merge_shards",
+        help="Path to a root processed with --shard; combines all index fragments into one summary csv",
+        default=None,
+    )
+    parser.add_argument(
+        "-mo",
+        "--metrics_only",
+        help=(
+            "Optional. Skip all plots and files; only summarise pLDDT, PAE, pTM, ipTM and ranking "
+            "confidence as one JSON line per model, written to --metrics_file or standard output"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "-mf",
+        "--metrics_file",
+        help=(
+            "Optional. Also write the per-model JSON lines metric summary to this file "
+            "(- for standard output)"
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "-pr",
+        "--probe",
+        help=(
+            "Path to a model file, or a root of result directories, to list sequence length and available "
+            "metrics per model without loading it; for a directory, also writes alphapickle_inventory.jsonl"
+        ),
+        default=None,
+    )
     args = parser.parse_args(argv)
 
-    print(BANNER)
+    metrics_destination = args.metrics_file or ("-" if args.metrics_only else None)
+    # Keep standard output clean for JSON lines.
+    log = sys.stderr if metrics_destination == "-" or args.probe else sys.stdout
+    print(BANNER, file=log)
 
     runner = AlphaPickleRunner(
         fasta_file=args.fasta_file,
         plot_size=args.plot_size,
         axis_label_increment=args.plot_increment,
+        pae_tiles=args.pae_tiles,
+        batch_mode=args.batch_mode,
+        binary_metrics=args.binary_metrics,
+        n_jobs=args.n_jobs,
+        memory_budget=args.memory_budget,
+        share_memory=args.shared_memory,
+        plddt_style=args.plddt_style,
     )
 
-    if args.pickle_file and not args.output_directory and not args.pdb_file and not args.pae_json_file:
-        runner.process_pickle(args.pickle_file)
-    elif args.output_directory and not args.pickle_file and not args.pdb_file and not args.pae_json_file:
-        runner.process_directory(args.output_directory)
-    elif args.pdb_file and not args.pickle_file and not args.output_directory and not args.pae_json_file:
-        runner.process_pdb(args.pdb_file)
-    elif args.pae_json_file and not args.pickle_file and not args.output_directory and not args.pdb_file:
-        runner.process_pae_json(args.pae_json_file)
-    else:
+    inputs = {
+        "pickle_file": args.pickle_file,
+        "output_directory": args.output_directory,
+        "pdb_file": args.pdb_file,
+        "pae_json_file": args.pae_json_file,
+        "merge_shards": args.merge_shards,
+        "probe": args.probe,
+    }
+    selected = [name for name, value in inputs.items() if value]
+    if len(selected) != 1:
         parser.error(
-            "Provide exactly one of pickle_file, output_directory, pdb_file, or pae_json_file"
+            "Provide exactly one of pickle_file, output_directory, pdb_file, pae_json_file, merge_shards, or probe"
         )
+    if args.shard and selected != ["output_directory"]:
+        parser.error("--shard requires output_directory")
+    if metrics_destination and (args.shard or args.merge_shards or args.probe):
+        parser.error("--metrics_only and --metrics_file cannot be combined with --shard, --merge_shards or --probe")
+
+    if args.probe:
+        if os.path.isdir(args.probe):
+            entries = build_inventory(args.probe)
+            inventory = write_inventory(args.probe, entries)
+            write_json_lines(entries)
+            print(f"Inventory written to {inventory}", file=log)
+        else:
+            write_json_lines([probe_file(args.probe)])
+        return
+
+    if args.metrics_only:
+        if args.pickle_file:
+            summaries = [runner.summarise_model(AlphaFoldPickle, args.pickle_file)]
+        elif args.output_directory:
+            summaries = runner.summarise_directory(args.output_directory)
+        elif args.pdb_file:
+            summaries = [runner.summarise_model(AlphaFoldPDB, args.pdb_file)]
+        else:
+            summaries = [runner.summarise_model(AlphaFoldPAEJson, args.pae_json_file)]
+        write_json_lines(summaries, metrics_destination)
+        print("Processing complete!", file=log)
+        return
+
+    results = []
+    if args.pickle_file:
+        results = [runner.process_pickle(args.pickle_file)]
+    elif args.output_directory and args.shard:
+        runner.process_shard(args.output_directory, *args.shard)
+    elif args.output_directory:
+        results = runner.process_directory(args.output_directory)
+    elif args.pdb_file:
+        results = [runner.process_pdb(args.pdb_file)]
+    elif args.pae_json_file:
+        results = [runner.process_pae_json(args.pae_json_file)]
+    else:
+        merge_shards(args.merge_shards)
+    if metrics_destination:
+        write_json_lines((summarise(obj) for obj in results), metrics_destination)
 
-    print("Processing complete!")
-    print("Data saved to output directory")
+    print("Processing complete!", file=log)
+    print("Data saved to output directory", file=log)
     print(
         "If you use AlphaPickle in your work (during analysis, or for plots that end up in publications), "
-        "please cite AlphaPickle as follows: Arnold, M. J. (2021) AlphaPickle doi.org/10.5281/zenodo.5708709"
+        "please cite AlphaPickle as follows: Arnold, M. J. (2021) AlphaPickle doi.org/10.5281/zenodo.5708709",
+        file=log,
     )
 
 
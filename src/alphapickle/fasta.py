@@ -0,0 +1,70 @@
+"""FASTA parsing and residue labelling for per-residue tables."""
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+import os
+import string
+import warnings
+
+import numpy as np
+
+_CHAIN_IDS = string.ascii_uppercase + string.ascii_lowercase + string.digits
+
+
+@lru_cache(maxsize=32)
+def _parse_fasta(path: str, mtime_ns: int, size: int) -> tuple[tuple[str, bytes], ...]:
+    """Parse ``path``; cache keys include mtime and size so edits are picked up."""
+    with open(path, "rb") as fh:
+        text = fh.read()
+    records = []
+    for chunk in text.split(b">")[1:]:
+        header, _, body = chunk.partition(b"\n")
+        sequence = b"".join(body.split()).rstrip(b"*").upper()
+        records.append((header.strip().decode(), sequence))
+    return tuple(records)
+
+
+def read_fasta(path: str | Path) -> tuple[tuple[str, bytes], ...]:
+    """Return ``(header, sequence)`` pairs from a possibly multi-record FASTA file.
+
+    Sequences are returned as upper-case ASCII bytes with whitespace removed.
+    Results are cached per file, so batches sharing one FASTA parse it once.
+    """
+    stat = os.stat(path)
+    return _parse_fasta(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def residue_labels(records: tuple[tuple[str, bytes], ...], n_residues: int) -> dict[str, np.ndarray] | None:
+    """Build per-residue label columns matching a pLDDT array of ``n_residues``.
+
+    A single sequence of the right length yields a ``Residue`` column. If the
+    concatenated records match, ``Chain`` and ``Position`` columns are added so
+    that each residue is attributed to its chain, in AlphaFold-Multimer order.
+    Lengths are validated before any arrays are built; on mismatch a warning
+    is issued and ``None`` is returned so the FASTA file is ignored.
+    """
+    lengths = np.fromiter((len(seq) for _, seq in records), dtype=np.int64, count=len(records))
+    if len(records) > 1 and lengths.sum() != n_residues:
+        matching = np.flatnonzero(lengths == n_residues)
+        if matching.size:
+            records = (records[matching[0]],)
+            lengths = lengths[matching[:1]]
+    if lengths.sum() != n_residues:
+        warnings.warn(
+            f"Length of sequence in fasta file provided ({lengths.sum()}) does not match length of "
+            f"sequence used in AlphaFold prediction ({n_residues}). Ignoring fasta file."
+        )
+        return None
+    residues = np.frombuffer(b"".join(seq for _, seq in records), dtype="S1")
+    if len(records) == 1:
+        return {"Residue": residues.astype("U1")}
+    chain_ids = np.array(
+        [_CHAIN_IDS[i] if i < len(_CHAIN_IDS) else str(i + 1) for i in range(len(records))]
+    )
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return {
+        "Chain": np.repeat(chain_ids, lengths),
+        "Position": np.arange(1, n_residues + 1) - starts,
+        "Residue": residues.astype("U1"),
+    }
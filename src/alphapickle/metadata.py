@@ -1,14 +1,94 @@
 """Core utilities for working with AlphaFold metadata."""
 from __future__ import annotations
 
+from functools import partial
 from pathlib import Path
 import json
+import mmap
 import pickle
+import re
 
 import numpy as np
 import pandas as pd
 from Bio import PDB
-from matplotlib import pyplot as plt, colors
+
+from alphapickle.fasta import read_fasta, residue_labels
+from alphapickle.records import ModelRecord
+from alphapickle.tiles import write_pae_pyramid
+
+_JSON_DELIMITERS = bytes.maketrans(b"[],\r\n\t", b"      ")
+# Per-sample subfolders written by AlphaFold 3 inside a job folder.
+_AF3_SAMPLES = "seed-*_sample-*"
+_PICKLE_SCORES = ("ptm", "iptm", "ranking_confidence", "max_predicted_aligned_error")
+
+
+def _json_array_span(buffer: bytes | mmap.mmap, key: str) -> tuple[int, int, int]:
+    """Locate the array stored under ``key``, returning its start, end and nesting depth."""
+    match = re.search(rb'"%s"\s*:\s*(?:\[\s*)+' % re.escape(key.encode()), buffer)
+    if match is None:
+        raise KeyError(key)
+    depth = match.group(0).count(b"[")
+    start = match.start() + match.group(0).index(b"[")
+    closing = re.compile(rb"\]" + rb"\s*\]" * (depth - 1)).search(buffer, match.end())
+    if closing is None:
+        raise ValueError(f"Unterminated array for {key!r}")
+    return start, closing.end(), depth
+
+
+def _read_json_array(buffer: bytes | mmap.mmap, key: str, dtype: np.dtype | type = np.float64) -> np.ndarray:
+    """Parse a numeric (nested) array straight into NumPy, without building Python floats.
+
+    ``buffer`` is typically a memory map of a large JSON file; only the bytes
+    of the requested array are copied out of it.
+    """
+    start, end, depth = _json_array_span(buffer, key)
+    if depth > 2:
+        raise ValueError(f"Arrays nested deeper than two levels are not supported: {key!r}")
+    chunk = bytes(buffer[start:end])
+    values = np.fromstring(chunk.translate(_JSON_DELIMITERS), dtype=dtype, sep=" ")
+    if depth == 2:
+        values = values.reshape(chunk.count(b"[") - 1, -1)
+    return values
+
+
+def _read_json_strings(buffer: bytes | mmap.mmap, key: str) -> list[str]:
+    """Parse a flat array of strings stored under ``key``."""
+    start, end, _ = _json_array_span(buffer, key)
+    return json.loads(buffer[start:end])
+
+
+def _read_json_scalar(buffer: bytes | mmap.mmap, key: str) -> float | None:
+    """Return the number stored under ``key``, or ``None`` if it is absent or null."""
+    match = re.search(rb'"%s"\s*:\s*([-+0-9.eE]+)' % re.escape(key.encode()), buffer)
+    return float(match.group(1)) if match else None
+
+
+def _cif_residue_keys(path: Path) -> np.ndarray:
+    """Return a chain/residue key for every atom in an mmCIF ``atom_site`` loop."""
+    columns: list[str] = []
+    keys: list[str] = []
+    with open(path) as fh:
+        for line in fh:
+            if line.startswith("_atom_site."):
+                columns.append(line.split()[0][len("_atom_site."):])
+            elif columns and line.startswith(("ATOM", "HETATM")):
+                if not keys:
+                    chain = columns.index("label_asym_id")
+                    label_seq = columns.index("label_seq_id")
+                    auth_seq = columns.index("auth_seq_id")
+                fields = line.split()
+                keys.append(f"{fields[chain]}:{fields[label_seq]}:{fields[auth_seq]}")
+            elif keys:
+                break
+    return np.asarray(keys)
+
+
+def _segment_mean(values: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Average runs of ``values`` that share consecutive identical ``keys``."""
+    if len(values) != len(keys):
+        raise ValueError(f"Got {len(values)} values for {len(keys)} atoms")
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return np.add.reduceat(values, starts) / np.diff(np.r_[starts, len(values)])
 
 
 class AlphaFoldMetaData:
@@ -30,56 +110,87 @@ class AlphaFoldMetaData:
         self.saving_pathname = str(self.output_dir)
         self.pLDDT: np.ndarray | None = None
         self.PAE: np.ndarray | None = None
+        self.scores: dict = {}
 
     # plotting functions
-    def plot_plddt(self, size_in_inches: float = 12, axis_label_increment: int = 100) -> Path:
-        """Plot per-residue confidence values."""
+    def plot_plddt(self, size_in_inches: float = 12, axis_label_increment: int = 100, style: str = "scatter") -> Path:
+        """Plot per-residue confidence values.
+
+        ``style`` selects ``"scatter"`` markers, or a colour-mapped ``"line"``
+        that is reduced to min/max envelopes when longer than the pixel width.
+        """
         if self.pLDDT is None:
             raise ValueError("pLDDT data not loaded")
-        x = np.arange(len(self.pLDDT))
-        cmap = colors.LinearSegmentedColormap.from_list("", ["red", "orange", "yellow", "cornflowerblue", "blue"])
-        plt.figure(figsize=(size_in_inches, size_in_inches / 2))
-        plt.scatter(x, self.pLDDT, c=self.pLDDT, cmap=cmap, s=5)
-        plt.clim(0, 100)
-        ticks = np.arange(0, len(self.pLDDT), axis_label_increment)
-        plt.xticks(ticks, fontname="Helvetica")
-        plt.yticks(fontname="Helvetica")
-        plt.xlabel("Residue index", size=14, fontweight="bold", fontname="Helvetica")
-        plt.ylabel("Predicted LDDT", size=14, fontweight="bold", fontname="Helvetica")
-        scale = plt.colorbar(shrink=0.5)
-        scale.set_label(label="Predicted LDDT", size=12, fontweight="bold", fontname="Helvetica")
+        # Imported here so that loading and summarising never pull in matplotlib.
+        from alphapickle.plotting import render_plddt
+
         outfile = self.output_dir / f"{self.saving_filename}_pLDDT.png"
-        plt.savefig(outfile, dpi=300)
-        plt.close()
-        return outfile
+        return render_plddt(self.pLDDT, outfile, size_in_inches, axis_label_increment, style=style)
 
     def plot_pae(self, size_in_inches: float = 12, axis_label_increment: int = 100) -> Path:
         """Plot predicted aligned error."""
         if self.PAE is None:
             raise ValueError("PAE data not loaded")
-        plt.figure(figsize=(size_in_inches, size_in_inches))
-        im = plt.imshow(self.PAE)
-        ticks = np.arange(0, self.PAE.shape[0], axis_label_increment)
-        plt.xticks(ticks, fontname="Helvetica")
-        plt.yticks(ticks, fontname="Helvetica")
-        plt.xlabel("Residue index", size=14, fontweight="bold", fontname="Helvetica")
-        plt.ylabel("Residue index", size=14, fontweight="bold", fontname="Helvetica")
-        scale = plt.colorbar(im, shrink=0.5)
-        scale.set_label(label="Predicted error (Å)", size=12, fontweight="bold", fontname="Helvetica")
+        from alphapickle.plotting import render_pae
+
         outfile = self.output_dir / f"{self.saving_filename}_PAE.png"
-        plt.savefig(outfile, dpi=300)
-        plt.close()
+        render_pae(self.PAE, outfile, size_in_inches, axis_label_increment)
         pd.DataFrame(self.PAE).to_csv(
             self.output_dir / f"{self.saving_filename}_PAE.csv"
         )
         return outfile
 
+    def to_record(
+        self,
+        pae_dtype: np.dtype | str = np.float32,
+        plddt_dtype: np.dtype | str = np.float32,
+    ) -> ModelRecord:
+        """Convert to a compact :class:`ModelRecord` with the requested dtypes."""
+        return ModelRecord.from_arrays(
+            self.saving_filename,
+            str(self.path),
+            self.pLDDT,
+            self.PAE,
+            pae_dtype=pae_dtype,
+            plddt_dtype=plddt_dtype,
+        )
+
+    def write_metrics_file(
+        self,
+        pae_dtype: np.dtype | str = np.uint16,
+        plddt_dtype: np.dtype | str = np.uint8,
+    ) -> Path:
+        """Write pLDDT and PAE to a compact binary ``.npz`` file.
+
+        Metrics are quantised by default; see :mod:`alphapickle.records` for
+        the recorded scales and error bounds. Read back with :class:`AlphaFoldNpz`.
+        """
+        outfile = self.output_dir / f"{self.saving_filename}_metrics.npz"
+        return self.to_record(pae_dtype=pae_dtype, plddt_dtype=plddt_dtype).save(outfile)
+
+    def write_pae_tiles(self, tile_size: int = 256, archive: bool = False, fmt: str = "png") -> Path:
+        """Export PAE as a multi-resolution tile pyramid for interactive viewers."""
+        if self.PAE is None:
+            raise ValueError("PAE data not loaded")
+        suffix = "_PAE_tiles.zip" if archive else "_PAE_tiles"
+        return write_pae_pyramid(
+            self.PAE,
+            self.output_dir / f"{self.saving_filename}{suffix}",
+            tile_size=tile_size,
+            fmt=fmt,
+            archive=archive,
+        )
+
     def write_plddt_file(self) -> Path:
-        """Write pLDDT values to CSV."""
+        """Write pLDDT values to CSV, labelled with residues from ``fasta`` if provided."""
         if self.pLDDT is None:
             raise ValueError("pLDDT data not loaded")
         outfile = self.output_dir / f"{self.saving_filename}_pLDDT.csv"
-        pd.DataFrame({"pLDDT": self.pLDDT}).to_csv(outfile, index=False)
+        columns: dict[str, np.ndarray] = {}
+        if self.fasta:
+            columns = residue_labels(read_fasta(self.fasta), len(self.pLDDT)) or {}
+        columns["pLDDT"] = self.pLDDT
+        pd.DataFrame(columns).to_csv(outfile, index=False)
         return outfile
 
 
@@ -89,6 +200,10 @@ class AlphaFoldPickle(AlphaFoldMetaData):
     def __init__(self, path: str | Path, fasta: str | None = None, ranking: str | None = None) -> None:
         """Load pickled result data into memory.
 
+        Scalar scores present in the pickle (``ptm``, ``iptm``,
+        ``ranking_confidence`` and ``max_predicted_aligned_error``) are kept
+        in :attr:`scores`.
+
         Args:
             path: Pickle file produced by AlphaFold.
             fasta: Path to the input FASTA file, if available.
@@ -107,6 +222,9 @@ class AlphaFoldPickle(AlphaFoldMetaData):
         pae = first.get("predicted_aligned_error")
         self.PAE = np.asarray(pae) if pae is not None else None
         self.pLDDT = np.asarray(first["plddt"])
+        for key in _PICKLE_SCORES:
+            if first.get(key) is not None:
+                self.scores[key] = float(first[key])
 
 
 class AlphaFoldJson:
@@ -179,3 +297,154 @@ class AlphaFoldPAEJson(AlphaFoldMetaData):
             arr[int(i - 1), int(j - 1)] = val
         return arr
 
+
+class AlphaFoldNpz(AlphaFoldMetaData):
+    """Load metrics written by :meth:`AlphaFoldMetaData.write_metrics_file`."""
+
+    def __init__(self, path: str | Path, fasta: str | None = None, ranking: str | None = None) -> None:
+        """Read a metrics file, dequantising pLDDT and PAE to float32.
+
+        Args:
+            path: ``.npz`` file holding stored metrics.
+            fasta: Path to the input FASTA file, if available.
+            ranking: Ranking label to include in generated filenames.
+        """
+        super().__init__(path, fasta, ranking)
+        record = ModelRecord.load(self.path)
+        self.pLDDT = record.plddt_values
+        self.PAE = record.pae_values
+        self.data = []
+
+
+class AlphaFold3Confidences(AlphaFoldMetaData):
+    """Extract pLDDT and PAE from AlphaFold 3 confidence files."""
+
+    def __init__(self, path: str | Path, fasta: str | None = None, ranking: str | None = None) -> None:
+        """Load token PAE and per-residue pLDDT.
+
+        Per-atom pLDDT is averaged per residue, using the atom order of the
+        ``model.cif`` written next to the confidences. Summary scores such as
+        ``ptm``, ``iptm`` and ``ranking_score`` are kept in :attr:`scores`.
+
+        Args:
+            path: ``*confidences.json`` file produced by AlphaFold 3.
+            fasta: Path to the input FASTA file, if available.
+            ranking: Ranking label to include in generated filenames.
+        """
+        super().__init__(path, fasta, ranking)
+        prefix = self.path.name[: -len("confidences.json")]
+        with open(self.path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            atom_plddts = _read_json_array(buffer, "atom_plddts")
+            self.PAE = _read_json_array(buffer, "pae")
+        self.pLDDT = _segment_mean(atom_plddts, _cif_residue_keys(self.path.with_name(f"{prefix}model.cif")))
+        summary = self.path.with_name(f"{prefix}summary_confidences.json")
+        if summary.exists():
+            with open(summary) as fh:
+                self.scores = json.load(fh)
+        self.data = []
+
+
+class ColabFoldScores(AlphaFoldMetaData):
+    """Extract pLDDT and PAE from ColabFold ``*_scores_rank_*.json`` files."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        fasta: str | None = None,
+        ranking: str | None = None,
+        query: str | None = None,
+    ) -> None:
+        """Load per-residue pLDDT, PAE and pTM/ipTM scores.
+
+        Args:
+            path: Scores JSON file produced by ColabFold.
+            fasta: Path to the input FASTA file, if available.
+            ranking: Ranking label to include in generated filenames.
+            query: Query name prefixed to generated filenames, used when one
+                folder holds the models of several queries.
+        """
+        super().__init__(path, fasta, ranking)
+        if query and ranking:
+            self.saving_filename = f"{query}_{self.saving_filename}"
+        with open(self.path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            self.pLDDT = _read_json_array(buffer, "plddt")
+            self.PAE = _read_json_array(buffer, "pae") if buffer.find(b'"pae"') >= 0 else None
+            for key in ("ptm", "iptm", "max_pae"):
+                value = _read_json_scalar(buffer, key)
+                if value is not None:
+                    self.scores[key] = value
+        self.data = []
+
+
+def detect_layout(directory: str | Path) -> str:
+    """Identify the tool that produced a result directory.
+
+    Returns:
+        ``"af2"`` for ``ranking_debug.json`` plus pickles, ``"af3"`` for
+        AlphaFold 3 confidence JSONs, or ``"colabfold"`` for ColabFold score JSONs.
+        An AlphaFold 3 job folder has its own summary or ranking file, or
+        ``seed-*_sample-*`` sample folders; a folder that merely holds several
+        job folders is not itself a result directory.
+    """
+    directory = Path(directory)
+    if (directory / "ranking_debug.json").exists():
+        return "af2"
+    if (
+        any(directory.glob("*summary_confidences.json"))
+        or any(directory.glob("*ranking_scores.csv"))
+        or any(directory.glob(f"{_AF3_SAMPLES}/*summary_confidences.json"))
+    ):
+        return "af3"
+    if _colabfold_scores(directory):
+        return "colabfold"
+    raise FileNotFoundError(f"No AlphaFold 2, AlphaFold 3 or ColabFold outputs found in {directory}")
+
+
+_COLABFOLD_RANK = re.compile(r"(.*?)_(?:scores|unrelaxed|relaxed)_rank_(\d+)")
+
+
+def _colabfold_scores(directory: Path) -> list[Path]:
+    """Return ColabFold score files in ``directory``, covering old and new naming schemes."""
+    return sorted(set(directory.glob("*_scores_rank_*.json")) | set(directory.glob("*_rank_*_scores.json")))
+
+
+def ranked_models(directory: str | Path) -> list[tuple[int, Path, type[AlphaFoldMetaData]]]:
+    """List the ranked models of a result directory with the loader for each.
+
+    Returns:
+        ``(rank, path, loader)`` tuples ordered by rank. For a ColabFold folder
+        holding several queries, tuples are grouped by query and each loader
+        prefixes its outputs with the query name, e.g. ``q1_ranked_1``.
+    """
+    directory = Path(directory)
+    layout = detect_layout(directory)
+    if layout == "af2":
+        return [
+            (rank, directory / f"result_{model_name}.pkl", AlphaFoldPickle)
+            for rank, model_name in AlphaFoldJson(directory).ranking
+        ]
+    if layout == "af3":
+        summaries = sorted(directory.glob(f"{_AF3_SAMPLES}/*summary_confidences.json")) or sorted(
+            directory.glob("*summary_confidences.json")
+        )
+        scores = {}
+        for summary in summaries:
+            with open(summary) as fh:
+                scores[summary] = json.load(fh).get("ranking_score", 0.0)
+        summaries.sort(key=lambda summary: -scores[summary])
+        tasks = []
+        for rank, summary in enumerate(summaries, start=1):
+            prefix = summary.name[: -len("summary_confidences.json")]
+            tasks.append((rank, summary.with_name(f"{prefix}confidences.json"), AlphaFold3Confidences))
+        return tasks
+    queries: dict[str, list[tuple[int, Path]]] = {}
+    for path in _colabfold_scores(directory):
+        match = _COLABFOLD_RANK.match(path.name)
+        if match is None:
+            raise ValueError(f"Cannot read the query and rank of ColabFold output {path.name}")
+        queries.setdefault(match.group(1), []).append((int(match.group(2)), path))
+    tasks = []
+    for query, ranked in sorted(queries.items()):
+        loader = partial(ColabFoldScores, query=query) if len(queries) > 1 else ColabFoldScores
+        tasks.extend((rank, path, loader) for rank, path in sorted(ranked))
+    return tasks
@@ -0,0 +1,90 @@
+"""Per-model confidence summaries emitted as JSON lines.
+
+This module and the loaders it summarises do not import matplotlib, so
+metrics-only runs skip the plotting stack entirely.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import IO, Iterable
+import json
+import sys
+
+import numpy as np
+
+# Lower bounds of the AlphaFold pLDDT confidence bands.
+PLDDT_BANDS = {"very_high": 90, "confident": 70, "low": 50, "very_low": 0}
+# Summary scores copied from loader ``scores``, with accepted source keys.
+SCORE_KEYS = {
+    "ptm": ("ptm",),
+    "iptm": ("iptm",),
+    "ranking_confidence": ("ranking_confidence", "ranking_score"),
+}
+
+
+def _scalar(value) -> float | None:
+    """Return ``value`` as a float, or None if it is not a single number."""
+    try:
+        array = np.asarray(value, dtype=np.float64)
+    except (TypeError, ValueError):
+        return None
+    return float(array) if array.ndim == 0 else None
+
+
+def summarise(obj) -> dict:
+    """Summarise the confidence metrics of a loaded model.
+
+    Args:
+        obj: A loaded :class:`~alphapickle.metadata.AlphaFoldMetaData`.
+
+    Returns:
+        A JSON-serialisable dict with the model name and source, pLDDT
+        mean/min and the fraction of residues in each confidence band, PAE
+        mean/max, and pTM, ipTM and ranking confidence where the output
+        provides them. Missing metrics are None.
+    """
+    summary: dict = {"model": obj.saving_filename, "source": str(obj.path)}
+    plddt = None if obj.pLDDT is None else np.asarray(obj.pLDDT, dtype=np.float64)
+    summary["n_residues"] = None if plddt is None else int(len(plddt))
+    summary["mean_plddt"] = None if plddt is None else float(plddt.mean())
+    summary["min_plddt"] = None if plddt is None else float(plddt.min())
+    upper = np.inf
+    for band, lower in PLDDT_BANDS.items():
+        summary[f"fraction_{band}"] = None if plddt is None else float(np.mean((plddt >= lower) & (plddt < upper)))
+        upper = lower
+    pae = None if obj.PAE is None else np.asarray(obj.PAE)
+    summary["mean_pae"] = None if pae is None else float(pae.mean(dtype=np.float64))
+    summary["max_pae"] = None if pae is None else float(pae.max())
+    for name, keys in SCORE_KEYS.items():
+        summary[name] = next(
+            (_scalar(obj.scores[key]) for key in keys if key in obj.scores), None
+        )
+    return summary
+
+
+def write_json_lines(summaries: Iterable[dict], destination: str | Path | IO[str] | None = None) -> int:
+    """Write one JSON object per line, flushing after each model.
+
+    Args:
+        summaries: Dicts from :func:`summarise`; may be a lazy iterator.
+        destination: Output path, an open text stream, or None or ``"-"``
+            for standard output.
+
+    Returns:
+        The number of lines written.
+    """
+    if destination is None or destination == "-":
+        return _write_lines(summaries, sys.stdout)
+    if hasattr(destination, "write"):
+        return _write_lines(summaries, destination)
+    with open(destination, "w") as fh:
+        return _write_lines(summaries, fh)
+
+
+def _write_lines(summaries: Iterable[dict], fh: IO[str]) -> int:
+    count = 0
+    for summary in summaries:
+        fh.write(json.dumps(summary) + "\n")
+        fh.flush()
+        count += 1
+    return count
@@ -0,0 +1,270 @@
+"""Rendering helpers shared across AlphaFold outputs."""
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Mapping
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+from matplotlib import font_manager, pyplot as plt, colors
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+PLDDT_CMAP = colors.LinearSegmentedColormap.from_list("", ["red", "orange", "yellow", "cornflowerblue", "blue"])
+DPI = 300
+# Resolution templates are laid out at between renders; ``savefig`` always
+# renders at ``DPI``, so this only bounds the size of the idle Agg buffer.
+_IDLE_DPI = 10
+# Figure templates kept per thread: one pLDDT and one PAE figure per run.
+MAX_TEMPLATES = 2
+
+
+def _plddt_segments(plddt: np.ndarray, max_points: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return line segments and their colour values for a pLDDT trace.
+
+    Traces longer than ``max_points`` are split into that many bins. Each bin
+    is drawn as a vertical min/max envelope at its centre, joined to the next
+    bin from its last to the next bin's first value, so every excursion that
+    would be visible at the output resolution is kept.
+    """
+    plddt = np.asarray(plddt, dtype=np.float64)
+    n = len(plddt)
+    if n <= max_points:
+        points = np.column_stack([np.arange(n), plddt])
+        return np.stack([points[:-1], points[1:]], axis=1), (plddt[:-1] + plddt[1:]) / 2
+    starts = np.linspace(0, n, max_points, endpoint=False).astype(np.int64)
+    ends = np.r_[starts[1:], n]
+    centres = (starts + ends - 1) / 2
+    lows = np.minimum.reduceat(plddt, starts)
+    highs = np.maximum.reduceat(plddt, starts)
+    means = np.add.reduceat(plddt, starts) / (ends - starts)
+    envelopes = np.stack([np.column_stack([centres, lows]), np.column_stack([centres, highs])], axis=1)
+    joins = np.stack(
+        [np.column_stack([centres[:-1], plddt[ends[:-1] - 1]]), np.column_stack([centres[1:], plddt[starts[1:]]])],
+        axis=1,
+    )
+    join_values = (plddt[ends[:-1] - 1] + plddt[starts[1:]]) / 2
+    return np.concatenate([envelopes, joins]), np.concatenate([means, join_values])
+
+
+@lru_cache(maxsize=None)
+def font_family() -> str:
+    """Return ``Helvetica`` if it is installed, otherwise the generic sans-serif family.
+
+    The lookup runs once per process, avoiding a ``findfont`` warning for
+    every text element when Helvetica is missing.
+    """
+    try:
+        font_manager.findfont("Helvetica", fallback_to_default=False)
+    except ValueError:
+        return "sans-serif"
+    return "Helvetica"
+
+
+class _FigureTemplate:
+    """Pre-built figure whose data artist is swapped between renders.
+
+    Building the figure, axes, labels and colour bar dominates the cost of
+    rendering small models, so each configuration is built once per thread
+    and only the data, limits and ticks are updated for every model.
+    """
+
+    def __init__(self, kind: str, size_in_inches: float, style: str) -> None:
+        self.kind = kind
+        self.style = style
+        family = font_family()
+        height = size_in_inches / 2 if kind == "plddt" else size_in_inches
+        self.figure = Figure(figsize=(size_in_inches, height), dpi=_IDLE_DPI)
+        FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+        if kind == "pae":
+            self.artist = self.ax.imshow(np.zeros((1, 1)))
+            ylabel, bar_label = "Residue index", "Predicted error (Å)"
+        elif style == "scatter":
+            self.artist = self.ax.scatter([], [], c=[], cmap=PLDDT_CMAP, s=5, vmin=0, vmax=100)
+            ylabel, bar_label = "Predicted LDDT", "Predicted LDDT"
+        else:
+            self.artist = LineCollection([], cmap=PLDDT_CMAP, linewidths=1.5, rasterized=True)
+            self.artist.set_clim(0, 100)
+            self.ax.add_collection(self.artist, autolim=False)
+            ylabel, bar_label = "Predicted LDDT", "Predicted LDDT"
+        self.ax.set_xlabel("Residue index", size=14, fontweight="bold", fontname=family)
+        self.ax.set_ylabel(ylabel, size=14, fontweight="bold", fontname=family)
+        scale = self.figure.colorbar(self.artist, ax=self.ax, shrink=0.5)
+        scale.set_label(label=bar_label, size=12, fontweight="bold", fontname=family)
+
+    def render(self, values: np.ndarray, outfile: Path, axis_label_increment: int) -> Path:
+        """Draw ``values`` into the template and save it to ``outfile``."""
+        n = len(values)
+        ticks = np.arange(0, n, axis_label_increment)
+        if self.kind == "pae":
+            self.artist.set_data(values)
+            self.artist.set_extent((-0.5, values.shape[1] - 0.5, n - 0.5, -0.5))
+            self.artist.set_clim(np.min(values), np.max(values))
+            self.ax.set_xlim(-0.5, values.shape[1] - 0.5)
+            self.ax.set_ylim(n - 0.5, -0.5)
+            self.ax.set_yticks(ticks)
+        else:
+            if self.style == "scatter":
+                points = np.column_stack([np.arange(n), values])
+                self.artist.set_offsets(points)
+                self.artist.set_array(np.asarray(values))
+            else:
+                segments, colours = _plddt_segments(values, int(self.figure.get_figwidth() * DPI))
+                self.artist.set_segments(segments)
+                self.artist.set_array(colours)
+                points = segments.reshape(-1, 2) if len(segments) else np.column_stack([np.arange(n), values])
+            self.ax.ignore_existing_data_limits = True
+            self.ax.update_datalim(points)
+            self.ax.autoscale_view()
+        self.ax.set_xticks(ticks)
+        family = font_family()
+        for label in self.ax.get_xticklabels() + self.ax.get_yticklabels():
+            label.set_fontname(family)
+        self.figure.savefig(outfile, dpi=DPI)
+        if self.kind == "pae":
+            # Do not keep a large matrix alive between renders.
+            self.artist.set_data(np.zeros((1, 1)))
+        # The canvas caches the full-resolution Agg renderer (tens of MiB at
+        # 300 dpi) and text artists keep the last one they were drawn with;
+        # a draw at the idle resolution swaps both for a small renderer.
+        self.figure.draw_without_rendering()
+        return outfile
+
+
+_templates = threading.local()
+
+
+def _template(kind: str, size_in_inches: float, style: str = "scatter") -> _FigureTemplate:
+    """Return the cached template for a configuration, building it on first use."""
+    cache = getattr(_templates, "cache", None)
+    if cache is None:
+        cache = _templates.cache = {}
+    key = (kind, float(size_in_inches), style)
+    if key not in cache:
+        if len(cache) >= MAX_TEMPLATES:
+            cache.pop(next(iter(cache)))
+        cache[key] = _FigureTemplate(kind, size_in_inches, style)
+    return cache[key]
+
+
+def clear_templates() -> None:
+    """Drop all figure templates cached by the current thread."""
+    _templates.cache = {}
+
+
+def render_plddt(
+    plddt: np.ndarray,
+    outfile: str | Path,
+    size_in_inches: float = 12,
+    axis_label_increment: int = 100,
+    style: str = "scatter",
+) -> Path:
+    """Render a pLDDT trace coloured with the AlphaFold confidence palette.
+
+    Args:
+        plddt: Per-residue pLDDT values.
+        outfile: Destination image path.
+        size_in_inches: Figure width in inches.
+        axis_label_increment: Spacing of residue index tick labels.
+        style: ``"scatter"`` draws one marker per residue. ``"line"`` draws a
+            single rasterised line collection, reduced to min/max envelopes
+            when the trace is longer than the figure is wide in pixels; it
+            renders much faster for long sequences.
+    """
+    if style not in ("scatter", "line"):
+        raise ValueError(f"Unsupported pLDDT plot style: {style}")
+    return _template("plddt", size_in_inches, style).render(plddt, Path(outfile), axis_label_increment)
+
+
+def render_pae(
+    pae: np.ndarray,
+    outfile: str | Path,
+    size_in_inches: float = 12,
+    axis_label_increment: int = 100,
+) -> Path:
+    """Render a PAE matrix as a heat map with a colour bar."""
+    return _template("pae", size_in_inches).render(pae, Path(outfile), axis_label_increment)
+
+
+def plot_plddt_batch(
+    plddts: Mapping[str, np.ndarray],
+    outfile: str | Path,
+    layout: str = "overlay",
+    size_in_inches: float = 12,
+    axis_label_increment: int = 100,
+) -> Path:
+    """Plot several pLDDT traces in a single figure.
+
+    Args:
+        plddts: Mapping of model name to per-residue pLDDT values.
+        outfile: Destination image path.
+        layout: ``"overlay"`` draws one line per model on shared axes,
+            ``"grid"`` draws colour-mapped small multiples with one colorbar.
+        size_in_inches: Figure width in inches.
+        axis_label_increment: Spacing of residue index tick labels.
+    """
+    if layout not in ("overlay", "grid"):
+        raise ValueError(f"Unsupported batch layout: {layout}")
+    if not plddts:
+        raise ValueError("No pLDDT data to plot")
+    n_residues = max(len(values) for values in plddts.values())
+    ticks = np.arange(0, n_residues, axis_label_increment)
+    if layout == "overlay":
+        fig, ax = plt.subplots(figsize=(size_in_inches, size_in_inches / 2))
+        for name, values in plddts.items():
+            ax.plot(np.arange(len(values)), values, linewidth=1, label=name)
+        ax.set_ylim(0, 100)
+        ax.set_xticks(ticks)
+        ax.legend(fontsize=8)
+        ax.set_xlabel("Residue index", size=14, fontweight="bold", fontname=font_family())
+        ax.set_ylabel("Predicted LDDT", size=14, fontweight="bold", fontname=font_family())
+    else:
+        ncols = math.ceil(math.sqrt(len(plddts)))
+        nrows = math.ceil(len(plddts) / ncols)
+        fig, axes = plt.subplots(
+            nrows,
+            ncols,
+            figsize=(size_in_inches, max(size_in_inches * nrows / (2 * ncols), 1)),
+            sharex=True,
+            sharey=True,
+            squeeze=False,
+        )
+        norm = colors.Normalize(0, 100)
+        for ax, (name, values) in zip(axes.flat, plddts.items()):
+            ax.scatter(np.arange(len(values)), values, c=values, cmap=PLDDT_CMAP, norm=norm, s=2)
+            ax.set_title(name, size=10)
+            ax.set_xticks(ticks)
+        for ax in axes.flat[len(plddts):]:
+            ax.set_visible(False)
+        fig.supxlabel("Residue index", size=14, fontweight="bold", fontname=font_family())
+        fig.supylabel("Predicted LDDT", size=14, fontweight="bold", fontname=font_family())
+        scale = fig.colorbar(
+            plt.cm.ScalarMappable(norm=norm, cmap=PLDDT_CMAP), ax=axes.ravel().tolist(), shrink=0.5
+        )
+        scale.set_label(label="Predicted LDDT", size=12, fontweight="bold", fontname=font_family())
+    outfile = Path(outfile)
+    fig.savefig(outfile, dpi=DPI)
+    plt.close(fig)
+    return outfile
+
+
+def write_plddt_table(plddts: Mapping[str, np.ndarray], outfile: str | Path) -> Path:
+    """Write pLDDT traces as one wide table with a column per model.
+
+    The format follows the suffix of ``outfile``: ``.parquet`` requires a
+    pandas Parquet engine such as ``pyarrow``; anything else is written as CSV.
+    Shorter traces are padded with empty values.
+    """
+    outfile = Path(outfile)
+    table = pd.DataFrame({name: pd.Series(values) for name, values in plddts.items()})
+    table.index = pd.RangeIndex(1, len(table) + 1, name="Residue")
+    if outfile.suffix == ".parquet":
+        table.to_parquet(outfile)
+    else:
+        table.to_csv(outfile)
+    return outfile
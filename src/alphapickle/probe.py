@@ -0,0 +1,412 @@
+"""Cheap probing of model files for sequence length and available metrics.
+
+A probe reads only as much of a file as it needs and never builds the full
+arrays:
+
+* pickles are walked opcode by opcode with a simulated stack; array payloads
+  are skipped with ``seek`` and no code from the pickle is ever executed;
+* PDB files stop at the first ``ATOM`` record when ``SEQRES`` is present,
+  otherwise at the end of the first model;
+* mmCIF files are answered from ``_entity_poly_seq`` and ``_struct_asym``
+  before the ``atom_site`` loop is reached;
+* JSON files are memory-mapped and scanned once for all known keys with a
+  single pattern; the sequence length is taken from the first row of the PAE
+  matrix, or the pLDDT array when there is no PAE, without parsing either.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import IO
+import json
+import mmap
+import pickletools
+import re
+import struct
+
+from alphapickle.metadata import _cif_residue_keys, _json_array_span, ranked_models
+
+# Canonical metric names and the keys that provide them, by file type.
+_PICKLE_METRICS = {
+    "plddt": ("plddt",),
+    "pae": ("predicted_aligned_error",),
+    "max_pae": ("max_predicted_aligned_error",),
+    "ptm": ("ptm",),
+    "iptm": ("iptm",),
+    "ranking_confidence": ("ranking_confidence",),
+}
+_JSON_METRICS = {
+    "plddt": ("plddt", "atom_plddts"),
+    "pae": ("pae", "predicted_aligned_error", "distance"),
+    "max_pae": ("max_pae", "max_predicted_aligned_error"),
+    "ptm": ("ptm",),
+    "iptm": ("iptm",),
+    "ranking_confidence": ("ranking_confidence", "ranking_score"),
+}
+# Keys that give the sequence length of a JSON file, in order of preference.
+_JSON_LENGTH_KEYS = ("pae", "predicted_aligned_error", "plddt", "token_res_ids")
+_JSON_KEY_PATTERN = re.compile(
+    rb'"(%s)"\s*:'
+    % b"|".join(
+        re.escape(key.encode())
+        for key in sorted({*_JSON_LENGTH_KEYS, "residue1", *(k for keys in _JSON_METRICS.values() for k in keys)})
+    )
+)
+# Strings and byte strings longer than this are skipped rather than decoded.
+_MAX_DECODED = 1024
+_LENGTH_FORMATS = {
+    pickletools.TAKEN_FROM_ARGUMENT1: "<B",
+    pickletools.TAKEN_FROM_ARGUMENT4: "<i",
+    pickletools.TAKEN_FROM_ARGUMENT4U: "<I",
+    pickletools.TAKEN_FROM_ARGUMENT8U: "<Q",
+}
+_OPCODES = {op.code.encode("latin-1"): op for op in pickletools.opcodes}
+_MARK = object()
+
+
+def probe_file(path: str | Path) -> dict:
+    """Report the size and available metrics of a model file without loading it.
+
+    Args:
+        path: An AlphaFold pickle, PDB, mmCIF or JSON output file.
+
+    Returns:
+        A dict with the ``source`` path, its ``format``, ``bytes`` on disk,
+        ``n_residues`` (None if it cannot be determined cheaply) and the sorted
+        list of ``metrics`` present, using the names ``plddt``, ``pae``,
+        ``max_pae``, ``ptm``, ``iptm`` and ``ranking_confidence``.
+
+    Raises:
+        ValueError: If the file type is not supported.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".pkl":
+        fmt, (n_residues, metrics) = "pickle", _probe_pickle(path)
+    elif suffix in (".pdb", ".ent"):
+        fmt, (n_residues, metrics) = "pdb", _probe_pdb(path)
+    elif suffix in (".cif", ".mmcif"):
+        fmt, (n_residues, metrics) = "mmcif", _probe_cif(path)
+    elif suffix == ".json":
+        fmt, (n_residues, metrics) = "json", _probe_json(path)
+    else:
+        raise ValueError(f"Unsupported file type for probing: {path}")
+    return {
+        "source": str(path),
+        "format": fmt,
+        "bytes": path.stat().st_size,
+        "n_residues": n_residues,
+        "metrics": sorted(metrics),
+    }
+
+
+def probe_directory(directory: str | Path) -> list[dict]:
+    """Probe every existing ranked model of a result directory, adding its ``rank``."""
+    return [{"rank": rank, **probe_file(path)} for rank, path, _ in ranked_models(directory) if path.exists()]
+
+
+class _List:
+    """Stand-in for a list, set or frozenset that only counts its items."""
+
+    __slots__ = ("length",)
+
+    def __init__(self, length: int = 0) -> None:
+        self.length = length
+
+
+class _Dict:
+    """Stand-in for a dict that keeps its keys and value stand-ins."""
+
+    __slots__ = ("items",)
+
+    def __init__(self) -> None:
+        self.items: dict = {}
+
+    def update(self, flat: list) -> None:
+        for key, value in zip(flat[::2], flat[1::2]):
+            if isinstance(key, (str, bytes, int, float, tuple)):
+                self.items[key] = value
+
+
+class _Object:
+    """Stand-in for an object built by a global; tracks NumPy array shapes."""
+
+    __slots__ = ("name", "shape")
+
+    def __init__(self, name: str, args=()) -> None:
+        self.name = name
+        self.shape = None
+        # Out-of-band NumPy arrays: ``_frombuffer(buffer, dtype, shape, order)``.
+        if name.endswith("_frombuffer") and isinstance(args, tuple) and len(args) >= 3:
+            self.shape = args[2] if _is_shape(args[2]) else None
+
+    def build(self, state) -> None:
+        # In-band NumPy arrays: ``(version, shape, dtype, is_fortran, data)``.
+        if isinstance(state, tuple) and len(state) == 5 and _is_shape(state[1]):
+            self.shape = state[1]
+
+
+def _is_shape(value) -> bool:
+    return isinstance(value, tuple) and all(isinstance(item, int) for item in value)
+
+
+def _length(value) -> int | None:
+    """Return the leading dimension of a stand-in value."""
+    if isinstance(value, _List):
+        return value.length
+    if isinstance(value, _Object) and value.shape:
+        return value.shape[0]
+    if isinstance(value, (tuple, list)):
+        return len(value)
+    return None
+
+
+def _read_argument(fh: IO[bytes], op: pickletools.OpcodeInfo):
+    """Read the argument of ``op``, skipping large string and bytes payloads."""
+    arg = op.arg
+    if arg is None:
+        return None
+    if arg.n not in _LENGTH_FORMATS:
+        return arg.reader(fh)
+    fmt = _LENGTH_FORMATS[arg.n]
+    (length,) = struct.unpack(fmt, fh.read(struct.calcsize(fmt)))
+    if length > _MAX_DECODED:
+        fh.seek(length, 1)
+        return _List(length)
+    data = fh.read(length)
+    return data.decode("utf-8", "surrogatepass") if "UNICODE" in op.name else data
+
+
+def _walk_pickle(fh: IO[bytes]):
+    """Simulate the first pickle in ``fh`` and return its top-level stand-in value."""
+    stack: list = []
+    memo: dict = {}
+
+    def pop_mark() -> list:
+        index = len(stack) - 1 - stack[::-1].index(_MARK)
+        items = stack[index + 1:]
+        del stack[index:]
+        return items
+
+    while True:
+        code = fh.read(1)
+        if not code:
+            raise ValueError("Pickle ended before STOP")
+        op = _OPCODES.get(code)
+        if op is None:
+            raise ValueError(f"Unknown pickle opcode {code!r}")
+        arg = _read_argument(fh, op)
+        name = op.name
+        if name == "STOP":
+            return stack.pop() if stack else None
+        if name in ("PROTO", "FRAME", "READONLY_BUFFER"):
+            continue
+        if name == "MARK":
+            stack.append(_MARK)
+        elif name in ("NONE", "NEWTRUE", "NEWFALSE"):
+            stack.append({"NONE": None, "NEWTRUE": True, "NEWFALSE": False}[name])
+        elif name == "EMPTY_DICT":
+            stack.append(_Dict())
+        elif name in ("EMPTY_LIST", "EMPTY_SET"):
+            stack.append(_List())
+        elif name == "EMPTY_TUPLE":
+            stack.append(())
+        elif name in ("LIST", "FROZENSET"):
+            stack.append(_List(len(pop_mark())))
+        elif name == "TUPLE":
+            stack.append(tuple(pop_mark()))
+        elif name in ("TUPLE1", "TUPLE2", "TUPLE3"):
+            n = int(name[-1])
+            items = tuple(stack[-n:])
+            del stack[-n:]
+            stack.append(items)
+        elif name == "DICT":
+            value = _Dict()
+            value.update(pop_mark())
+            stack.append(value)
+        elif name == "APPEND":
+            stack.pop()
+            if isinstance(stack[-1], _List):
+                stack[-1].length += 1
+        elif name in ("APPENDS", "ADDITEMS"):
+            items = pop_mark()
+            if isinstance(stack[-1], _List):
+                stack[-1].length += len(items)
+        elif name == "SETITEM":
+            items = stack[-2:]
+            del stack[-2:]
+            if isinstance(stack[-1], _Dict):
+                stack[-1].update(items)
+        elif name == "SETITEMS":
+            items = pop_mark()
+            if isinstance(stack[-1], _Dict):
+                stack[-1].update(items)
+        elif name in ("GLOBAL", "INST"):
+            qualified = arg.replace(" ", ".")
+            if name == "INST":
+                pop_mark()
+                stack.append(_Object(qualified))
+            else:
+                stack.append(qualified)
+        elif name == "STACK_GLOBAL":
+            attribute = stack.pop()
+            stack.append(f"{stack.pop()}.{attribute}")
+        elif name in ("REDUCE", "NEWOBJ"):
+            args = stack.pop()
+            stack.append(_Object(str(stack.pop()), args))
+        elif name == "NEWOBJ_EX":
+            del stack[-1]
+            args = stack.pop()
+            stack.append(_Object(str(stack.pop()), args))
+        elif name == "OBJ":
+            items = pop_mark()
+            stack.append(_Object(str(items[0]) if items else ""))
+        elif name == "BUILD":
+            state = stack.pop()
+            if isinstance(stack[-1], _Object):
+                stack[-1].build(state)
+        elif name in ("PUT", "BINPUT", "LONG_BINPUT"):
+            memo[arg] = stack[-1]
+        elif name == "MEMOIZE":
+            memo[len(memo)] = stack[-1]
+        elif name in ("GET", "BINGET", "LONG_BINGET"):
+            stack.append(memo[arg])
+        elif name == "POP":
+            stack.pop()
+        elif name == "POP_MARK":
+            pop_mark()
+        elif name == "DUP":
+            stack.append(stack[-1])
+        elif name == "BINPERSID":
+            stack[-1] = _Object("persistent")
+        elif name in ("PERSID", "EXT1", "EXT2", "EXT4", "NEXT_BUFFER"):
+            stack.append(_Object(name.lower()))
+        else:
+            # Remaining opcodes push their decoded argument: numbers, strings and bytes.
+            stack.append(arg)
+
+
+def _probe_pickle(path: Path) -> tuple[int | None, set[str]]:
+    with open(path, "rb") as fh:
+        result = _walk_pickle(fh)
+    items = result.items if isinstance(result, _Dict) else {}
+    metrics = {name for name, keys in _PICKLE_METRICS.items() if any(key in items for key in keys)}
+    n_residues = _length(items.get("plddt"))
+    if n_residues is None and isinstance(items.get("predicted_aligned_error"), (_Object, _List)):
+        n_residues = _length(items["predicted_aligned_error"])
+    return n_residues, metrics
+
+
+def _probe_pdb(path: Path) -> tuple[int | None, set[str]]:
+    seqres: dict[str, int] = {}
+    count = 0
+    previous = None
+    with open(path) as fh:
+        for line in fh:
+            if line.startswith("SEQRES"):
+                seqres.setdefault(line[11], int(line[13:17]))
+            elif line.startswith(("ATOM", "HETATM")):
+                if seqres:
+                    break
+                residue = (line[21], line[22:27])
+                if residue != previous:
+                    count += 1
+                    previous = residue
+            elif line.startswith("END") and count:
+                break
+    n_residues = sum(seqres.values()) or count or None
+    return n_residues, {"plddt"} if n_residues else set()
+
+
+def _cif_header_tables(fh: IO[str], categories: tuple[str, ...]) -> dict[str, list[dict]]:
+    """Collect rows of the given categories up to the start of ``atom_site``."""
+    tables: dict[str, list[dict]] = {category: [] for category in categories}
+    columns: list[str] = []
+    category = None
+    in_loop = in_text = False
+    for line in fh:
+        if line.startswith(";"):
+            in_text = not in_text
+            continue
+        if in_text:
+            continue
+        if line.startswith("_atom_site."):
+            break
+        stripped = line.strip()
+        if stripped == "loop_":
+            in_loop, columns, category = True, [], None
+        elif stripped.startswith("_"):
+            parts = stripped.split(None, 1)
+            name, _, field = parts[0][1:].partition(".")
+            if in_loop and len(parts) == 1:
+                category = name
+                columns.append(field)
+            else:
+                in_loop = False
+                if name in tables:
+                    if not tables[name]:
+                        tables[name].append({})
+                    tables[name][0][field] = parts[1].strip().strip("'\"") if len(parts) > 1 else ""
+        elif stripped == "#":
+            in_loop = False
+        elif in_loop and category in tables and stripped:
+            tables[category].append(dict(zip(columns, stripped.split())))
+    return tables
+
+
+def _probe_cif(path: Path) -> tuple[int | None, set[str]]:
+    with open(path) as fh:
+        tables = _cif_header_tables(fh, ("entity_poly_seq", "struct_asym"))
+    sequences: dict[str, set[str]] = {}
+    for row in tables["entity_poly_seq"]:
+        sequences.setdefault(row.get("entity_id"), set()).add(row.get("num"))
+    if sequences:
+        chains = [row.get("entity_id") for row in tables["struct_asym"]] or list(sequences)
+        # Non-polymer chains such as ligands count as one residue each.
+        n_residues = sum(len(sequences.get(entity, ())) or 1 for entity in chains)
+    else:
+        keys = _cif_residue_keys(path)
+        n_residues = int((keys[1:] != keys[:-1]).sum()) + 1 if len(keys) else None
+    return n_residues, {"plddt"} if n_residues else set()
+
+
+def _json_keys(buffer: mmap.mmap) -> dict[str, int]:
+    """Return the offset just past the first occurrence of each known key, in one scan."""
+    offsets: dict[str, int] = {}
+    for match in _JSON_KEY_PATTERN.finditer(buffer):
+        offsets.setdefault(match.group(1).decode(), match.end())
+    return offsets
+
+
+def _row_length(buffer: mmap.mmap, offset: int) -> int | None:
+    """Return the length of the first innermost row of the array starting at ``offset``.
+
+    Only the bytes up to the end of that row are read, so the length of an
+    N x N PAE matrix is found without touching the rest of it.
+    """
+    match = re.compile(rb"\s*(?:\[\s*)+").match(buffer, offset)
+    if match is None:
+        return None
+    row = buffer[match.end():buffer.find(b"]", match.end())].strip()
+    return row.count(b",") + 1 if row else 0
+
+
+def _probe_json(path: Path) -> tuple[int | None, set[str]]:
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        offsets = _json_keys(buffer)
+        metrics = {name for name, keys in _JSON_METRICS.items() if any(key in offsets for key in keys)}
+        n_residues = None
+        for key in _JSON_LENGTH_KEYS:
+            n_residues = _row_length(buffer, offsets[key]) if key in offsets else None
+            if n_residues is not None:
+                break
+        if n_residues is None and "residue1" in offsets:
+            # Legacy PAE files list residue pairs row by row; the last entry is N.
+            start, end, _ = _json_array_span(buffer, "residue1")
+            n_residues = int(float(bytes(buffer[start:end]).strip(b"[] \r\n\t").rsplit(b",", 1)[-1]))
+    if path.name.endswith("confidences.json") and not path.name.endswith("summary_confidences.json"):
+        summary = path.with_name(path.name[: -len("confidences.json")] + "summary_confidences.json")
+        if summary.exists():
+            with open(summary) as fh:
+                scores = json.load(fh)
+            metrics |= {name for name, keys in _JSON_METRICS.items() if any(key in scores for key in keys)}
+    return n_residues, metrics
@@ -0,0 +1,164 @@
+"""Compact in-memory records for large collections of loaded models.
+
+Metrics can be quantised to unsigned integer codes with a recorded scale,
+``value = code * scale``, over the fixed ranges ``0-100`` for pLDDT and
+``0-32`` Å for PAE (larger PAE values are clipped). Rounding bounds the
+absolute error of a dequantised value by ``scale / 2``:
+
+========  =====  ===========  =========
+Metric    dtype  scale        max error
+========  =====  ===========  =========
+pLDDT     uint8  100 / 255    0.197
+PAE       uint8  32 / 255     0.063 Å
+PAE       uint16 32 / 65535   0.00025 Å
+========  =====  ===========  =========
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import numpy as np
+
+PLDDT_MAX = 100.0
+PAE_MAX = 32.0
+
+
+def quantise(values: np.ndarray, dtype: np.dtype | str, upper: float) -> tuple[np.ndarray, float]:
+    """Map ``values`` in ``[0, upper]`` onto the full range of an unsigned integer ``dtype``.
+
+    Returns:
+        The integer codes and the scale that converts them back to values.
+    """
+    dtype = np.dtype(dtype)
+    if dtype.kind != "u":
+        raise ValueError("Quantised dtype must be an unsigned integer type")
+    scale = upper / np.iinfo(dtype).max
+    codes = np.rint(np.clip(np.asarray(values, dtype=np.float32), 0, upper) / np.float32(scale))
+    return codes.astype(dtype), scale
+
+
+def dequantise(codes: np.ndarray, scale: float) -> np.ndarray:
+    """Convert integer codes back to float32 values; floating input is returned as is."""
+    if codes.dtype.kind == "f":
+        return codes
+    return codes.astype(np.float32) * np.float32(scale)
+
+
+def _convert(values: np.ndarray | None, dtype: np.dtype | str, upper: float) -> tuple[np.ndarray | None, float]:
+    """Cast or quantise ``values`` to ``dtype``."""
+    if values is None:
+        return None, 1.0
+    dtype = np.dtype(dtype)
+    if dtype.kind == "f":
+        return np.asarray(values, dtype=dtype), 1.0
+    return quantise(values, dtype, upper)
+
+
+class ModelRecord:
+    """Slim, slot-based container holding only the arrays needed for screening.
+
+    Arrays may be stored as quantised codes (see the module documentation for
+    error bounds); use :attr:`plddt_values` and :attr:`pae_values` to read them.
+    """
+
+    __slots__ = ("name", "source", "plddt", "pae", "plddt_scale", "pae_scale")
+
+    def __init__(
+        self,
+        name: str,
+        source: str,
+        plddt: np.ndarray | None,
+        pae: np.ndarray | None,
+        plddt_scale: float = 1.0,
+        pae_scale: float = 1.0,
+    ) -> None:
+        """Store pre-converted arrays.
+
+        Args:
+            name: Base name used for generated outputs, e.g. ``ranked_1``.
+            source: Path of the file the record was loaded from.
+            plddt: Per-residue confidence values or quantised codes.
+            pae: Predicted aligned error matrix or quantised codes.
+            plddt_scale: Multiplier converting stored pLDDT codes to values.
+            pae_scale: Multiplier converting stored PAE codes to values.
+        """
+        self.name = name
+        self.source = source
+        self.plddt = plddt
+        self.pae = pae
+        self.plddt_scale = plddt_scale
+        self.pae_scale = pae_scale
+
+    @classmethod
+    def from_arrays(
+        cls,
+        name: str,
+        source: str,
+        plddt: np.ndarray | None,
+        pae: np.ndarray | None,
+        pae_dtype: np.dtype | str = np.float32,
+        plddt_dtype: np.dtype | str = np.float32,
+    ) -> "ModelRecord":
+        """Build a record, casting or quantising PAE and pLDDT to the requested dtypes.
+
+        Args:
+            name: Base name used for generated outputs.
+            source: Path of the file the record was loaded from.
+            plddt: Per-residue confidence values in the range 0-100.
+            pae: Predicted aligned error matrix.
+            pae_dtype: ``float32``/``float16``, or ``uint8``/``uint16`` to quantise.
+            plddt_dtype: ``float32``/``float16``, or ``uint8`` to quantise.
+        """
+        plddt, plddt_scale = _convert(plddt, plddt_dtype, PLDDT_MAX)
+        pae, pae_scale = _convert(pae, pae_dtype, PAE_MAX)
+        return cls(name, source, plddt, pae, plddt_scale, pae_scale)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ModelRecord":
+        """Read a record written by :meth:`save`, keeping arrays in their stored dtype."""
+        with np.load(path) as data:
+            return cls(
+                str(data["name"]),
+                str(data["source"]),
+                data["plddt"] if "plddt" in data else None,
+                data["pae"] if "pae" in data else None,
+                float(data["plddt_scale"]),
+                float(data["pae_scale"]),
+            )
+
+    def save(self, path: str | Path) -> Path:
+        """Write the record, including quantisation scales, to an uncompressed ``.npz`` file."""
+        arrays = {
+            "name": np.array(self.name),
+            "source": np.array(self.source),
+            "plddt_scale": np.array(self.plddt_scale),
+            "pae_scale": np.array(self.pae_scale),
+        }
+        if self.plddt is not None:
+            arrays["plddt"] = self.plddt
+        if self.pae is not None:
+            arrays["pae"] = self.pae
+        path = Path(path)
+        with open(path, "wb") as fh:
+            np.savez(fh, **arrays)
+        return path
+
+    @property
+    def plddt_values(self) -> np.ndarray | None:
+        """Return pLDDT as floating point values, dequantising if needed."""
+        return None if self.plddt is None else dequantise(self.plddt, self.plddt_scale)
+
+    @property
+    def pae_values(self) -> np.ndarray | None:
+        """Return PAE as floating point values, dequantising if needed."""
+        return None if self.pae is None else dequantise(self.pae, self.pae_scale)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by this record, including its arrays."""
+        total = sys.getsizeof(self) + sys.getsizeof(self.name) + sys.getsizeof(self.source)
+        for array in (self.plddt, self.pae):
+            if array is not None:
+                total += array.nbytes
+        return total
@@ -1,17 +1,33 @@
 """High level runner for AlphaPickle workflows."""
 from __future__ import annotations
 
+from contextlib import nullcontext
 from pathlib import Path
+from typing import Iterator
 
 import numpy as np
 from joblib import Parallel, delayed
 
+from alphapickle.fasta import read_fasta
 from alphapickle.metadata import (
-    AlphaFoldJson,
+    AlphaFoldMetaData,
     AlphaFoldPAEJson,
     AlphaFoldPDB,
     AlphaFoldPickle,
+    ranked_models,
 )
+from alphapickle.metrics import summarise
+from alphapickle.scheduler import MemoryBudgetScheduler, estimate_peak_memory, parse_memory
+from alphapickle.shards import (
+    assign_shards,
+    cached_probe,
+    find_inventory,
+    find_result_dirs,
+    index_entry,
+    read_inventory,
+    write_fragment,
+)
+from alphapickle.transport import ScratchSpace, attach_arrays, share_arrays
 
 
 class AlphaPickleRunner:
@@ -22,44 +38,197 @@ class AlphaPickleRunner:
         fasta_file: str | None = None,
         plot_size: float = 12,
         axis_label_increment: int = 100,
-        n_jobs: int = 1,
+        n_jobs: int | None = None,
+        pae_tiles: str | None = None,
+        batch_mode: str | None = None,
+        binary_metrics: bool = False,
+        memory_budget: int | str | None = None,
+        share_memory: bool = False,
+        plddt_style: str = "scatter",
     ) -> None:
-        """Configure default plotting options and threading behavior."""
+        """Configure default plotting options and threading behavior.
+
+        ``pae_tiles`` additionally exports PAE as a tile pyramid, either as a
+        ``"dir"`` of tiles or a single ``"zip"`` archive. ``batch_mode``
+        replaces per-model pLDDT outputs of :meth:`process_directory` with one
+        ``"overlay"`` or ``"grid"`` figure and a single wide CSV.
+        ``binary_metrics`` also writes quantised ``*_metrics.npz`` files.
+        ``n_jobs`` defaults to one worker, or with a ``memory_budget`` (bytes
+        or e.g. ``"16G"``) to the CPU count; the budget lets
+        :meth:`process_directory` adapt concurrency, up to ``n_jobs`` workers,
+        to the estimated peak memory of each model. ``share_memory`` returns
+        pLDDT, PAE and the large raw arrays from parallel workers as
+        memory-mapped scratch files instead of pickling them through pipes; it has no effect with a
+        single job. ``plddt_style`` is passed to
+        :meth:`AlphaFoldMetaData.plot_plddt`.
+        """
+        if pae_tiles not in (None, "dir", "zip"):
+            raise ValueError(f"Unsupported PAE tile output: {pae_tiles}")
+        if batch_mode not in (None, "overlay", "grid"):
+            raise ValueError(f"Unsupported batch mode: {batch_mode}")
+        if plddt_style not in ("scatter", "line"):
+            raise ValueError(f"Unsupported pLDDT plot style: {plddt_style}")
         self.fasta_file = fasta_file
         self.plot_size = plot_size
         self.axis_label_increment = axis_label_increment
         self.n_jobs = n_jobs
+        self.pae_tiles = pae_tiles
+        self.batch_mode = batch_mode
+        self.binary_metrics = binary_metrics
+        self.memory_budget = parse_memory(memory_budget) if memory_budget is not None else None
+        self.share_memory = share_memory
+        self.plddt_style = plddt_style
 
     def process_pickle(self, pickle_file: str | Path, ranking: int | None = None) -> AlphaFoldPickle:
         """Process a single AlphaFold pickle output file."""
-        obj = AlphaFoldPickle(pickle_file, self.fasta_file, ranking=str(ranking) if ranking else None)
-        obj.write_plddt_file()
-        obj.plot_plddt(self.plot_size, self.axis_label_increment)
+        return self._process_model(AlphaFoldPickle, pickle_file, ranking)
+
+    def _process_model(
+        self,
+        loader: type[AlphaFoldMetaData],
+        path: str | Path,
+        ranking: int | None = None,
+        plddt_outputs: bool = True,
+        space: ScratchSpace | None = None,
+    ) -> AlphaFoldMetaData:
+        """Load ``path`` with ``loader`` and write its outputs, optionally skipping pLDDT.
+
+        With a scratch ``space``, arrays are handed back as shared handles.
+        """
+        obj = loader(path, self.fasta_file, ranking=str(ranking) if ranking else None)
+        if plddt_outputs:
+            obj.write_plddt_file()
+            obj.plot_plddt(self.plot_size, self.axis_label_increment, style=self.plddt_style)
+        if self.binary_metrics:
+            obj.write_metrics_file()
         if isinstance(obj.PAE, np.ndarray):
             obj.plot_pae(self.plot_size, self.axis_label_increment)
+            self._write_pae_tiles(obj)
+        if space is not None:
+            share_arrays(obj, space)
         return obj
 
-    def process_directory(self, directory: str | Path) -> list[AlphaFoldPickle]:
-        """Batch process all ranking results in a directory."""
+    def process_directory(
+        self, directory: str | Path, inventory: dict[str, dict] | None = None
+    ) -> list[AlphaFoldMetaData]:
+        """Batch process all ranked results in a directory.
+
+        AlphaFold 2 (``ranking_debug.json`` plus pickles), AlphaFold 3 and
+        ColabFold layouts are detected automatically.
+
+        Args:
+            directory: Result directory to process.
+            inventory: Entries from :func:`alphapickle.shards.read_inventory`
+                used for memory estimates; by default the inventory in
+                ``directory`` or its nearest ancestor, if any, is read. Models
+                missing from it, or whose size has changed, are probed.
+        """
         directory = Path(directory)
-        rankings = AlphaFoldJson(directory).ranking
-        return Parallel(n_jobs=self.n_jobs)(
-            delayed(self.process_pickle)(
-                directory / f"result_{model_name}.pkl", ranking=rank
+        per_model = self.batch_mode is None
+        tasks = ranked_models(directory)
+        # Sharing only pays off when several workers hand results back.
+        in_process = self.n_jobs == 1 or (self.n_jobs is None and self.memory_budget is None)
+        with ScratchSpace() if self.share_memory and not in_process else nullcontext() as space:
+            if self.memory_budget is not None:
+                n_residues = self._fasta_length()
+                if n_residues is None and inventory is None:
+                    inventory = find_inventory(directory)
+                results = MemoryBudgetScheduler(self.memory_budget, self.n_jobs).map(
+                    self._process_model,
+                    [(loader, path, rank, per_model, space) for rank, path, loader in tasks],
+                    [
+                        estimate_peak_memory(
+                            path, n_residues or cached_probe(path, inventory)["n_residues"], self.plot_size
+                        )
+                        for _, path, _ in tasks
+                    ],
+                )
+            else:
+                results = Parallel(n_jobs=self.n_jobs or 1)(
+                    delayed(self._process_model)(
+                        loader, path, ranking=rank, plddt_outputs=per_model, space=space
+                    )
+                    for rank, path, loader in tasks
+                )
+            results = [attach_arrays(obj) for obj in results] if space is not None else results
+        if not per_model:
+            self._write_plddt_batch(directory, results)
+        return results
+
+    def summarise_model(
+        self, loader: type[AlphaFoldMetaData], path: str | Path, ranking: int | None = None
+    ) -> dict:
+        """Load ``path`` with ``loader`` and return its metric summary without writing any files."""
+        return summarise(loader(path, ranking=str(ranking) if ranking else None))
+
+    def summarise_directory(self, directory: str | Path) -> Iterator[dict]:
+        """Yield metric summaries of all ranked models in ``directory``, in rank order.
+
+        Nothing is rendered or written. Workers return only the small summary
+        dicts, and summaries are yielded as soon as they are ready so they can
+        be streamed out while later models are still loading.
+        """
+        tasks = ranked_models(directory)
+        return Parallel(n_jobs=self.n_jobs or 1, return_as="generator")(
+            delayed(self.summarise_model)(loader, path, ranking=rank) for rank, path, loader in tasks
+        )
+
+    def process_shard(self, root: str | Path, shard_index: int, n_shards: int) -> Path:
+        """Process one deterministic shard of all result directories below ``root``.
+
+        Every job of an array calls this with the same ``root`` and ``n_shards``;
+        each writes an index fragment that :func:`alphapickle.shards.merge_shards`
+        combines once all shards have finished.
+
+        Returns:
+            Path to the index fragment written for this shard.
+        """
+        root = Path(root).resolve()
+        shard = assign_shards(find_result_dirs(root), n_shards, root)[shard_index]
+        inventory = read_inventory(root)
+        entries = []
+        for directory in shard:
+            entries.extend(
+                index_entry(obj, root, directory) for obj in self.process_directory(directory, inventory)
             )
-            for rank, model_name in rankings
+        return write_fragment(root, shard_index, n_shards, entries)
+
+    def _fasta_length(self) -> int | None:
+        """Return the total sequence length of the FASTA file, if one was given."""
+        if not self.fasta_file:
+            return None
+        return sum(len(sequence) for _, sequence in read_fasta(self.fasta_file))
+
+    def _write_plddt_batch(self, directory: Path, results: list[AlphaFoldMetaData]) -> None:
+        """Write the combined pLDDT figure and table for a batch of models."""
+        from alphapickle.plotting import plot_plddt_batch, write_plddt_table
+
+        plddts = {obj.saving_filename: obj.pLDDT for obj in results if obj.pLDDT is not None}
+        write_plddt_table(plddts, directory / "ranked_pLDDT.csv")
+        plot_plddt_batch(
+            plddts,
+            directory / "ranked_pLDDT.png",
+            layout=self.batch_mode,
+            size_in_inches=self.plot_size,
+            axis_label_increment=self.axis_label_increment,
         )
 
     def process_pdb(self, pdb_file: str | Path) -> AlphaFoldPDB:
         """Extract and plot pLDDT values from a PDB file."""
         obj = AlphaFoldPDB(pdb_file, self.fasta_file)
         obj.write_plddt_file()
-        obj.plot_plddt(self.plot_size, self.axis_label_increment)
+        obj.plot_plddt(self.plot_size, self.axis_label_increment, style=self.plddt_style)
         return obj
 
     def process_pae_json(self, json_file: str | Path) -> AlphaFoldPAEJson:
         """Plot PAE values from a ColabFold-style JSON file."""
         obj = AlphaFoldPAEJson(json_file)
         obj.plot_pae(self.plot_size, self.axis_label_increment)
+        self._write_pae_tiles(obj)
         return obj
 
+    def _write_pae_tiles(self, obj: AlphaFoldMetaData) -> None:
+        """Export PAE tiles for ``obj`` when tiled output is enabled."""
+        if self.pae_tiles:
+            obj.write_pae_tiles(archive=self.pae_tiles == "zip")
+
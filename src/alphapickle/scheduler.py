@@ -0,0 +1,93 @@
+"""Memory-budget-aware scheduling of per-model work."""
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Sequence
+import math
+import os
+import re
+
+# Fixed cost of a worker: interpreter, NumPy, pandas and matplotlib.
+WORKER_OVERHEAD = 200 * 2**20
+# RGBA bytes per square inch of figure while a plot is saved at 300 dpi. The
+# per-thread figure templates release this buffer after every save.
+RENDER_BYTES_PER_SQUARE_INCH = 4 * 300**2
+# Bytes per residue pair held while writing outputs: the float64 PAE matrix,
+# its CSV formatting buffers and the resampled image drawn by ``imshow``.
+BYTES_PER_PAIR = 48
+# Approximate on-disk bytes per residue pair, used to infer sequence length
+# when it is not known: AF2 pickles hold distogram and aligned-confidence
+# logits (2 x 64 float32), JSON outputs hold PAE as text.
+_FILE_BYTES_PER_PAIR = {".pkl": 520, ".json": 6}
+_UNITS = {"": 1, "K": 2**10, "M": 2**20, "G": 2**30, "T": 2**40}
+
+
+def parse_memory(value: int | str) -> int:
+    """Convert a size such as ``"8G"``, ``"512M"`` or ``1024`` to bytes."""
+    if isinstance(value, int):
+        return value
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMGT]?)i?B?\s*", value, flags=re.IGNORECASE)
+    if match is None:
+        raise ValueError(f"Invalid memory size: {value!r}")
+    return int(float(match.group(1)) * _UNITS[match.group(2).upper()])
+
+
+def estimate_peak_memory(path: str | Path, n_residues: int | None = None, plot_size: float = 12) -> int:
+    """Estimate the peak resident memory needed to process one model.
+
+    Loading costs roughly the size of the input file, writing outputs scales
+    with the square of the sequence length, and drawing the square PAE plot
+    needs a full-resolution canvas of ``plot_size`` inches. When
+    ``n_residues`` is not given it is inferred from the file size.
+    """
+    path = Path(path)
+    file_size = path.stat().st_size
+    if n_residues is None:
+        n_residues = math.isqrt(file_size // _FILE_BYTES_PER_PAIR.get(path.suffix, 8))
+    render = int(RENDER_BYTES_PER_SQUARE_INCH * plot_size**2)
+    return WORKER_OVERHEAD + render + int(1.5 * file_size) + BYTES_PER_PAIR * n_residues**2
+
+
+class MemoryBudgetScheduler:
+    """Run tasks in worker processes while keeping estimated memory within a budget.
+
+    Tasks are admitted in order, but a task that does not fit may be overtaken
+    by later, smaller ones so that spare budget is not left idle. A task whose
+    estimate alone exceeds the budget is only started when nothing else runs.
+    """
+
+    def __init__(self, budget: int | str, max_workers: int | None = None) -> None:
+        """Configure the memory budget and the maximum number of workers.
+
+        Args:
+            budget: Total memory available to workers, in bytes or as ``"8G"``.
+            max_workers: Upper bound on concurrent workers; defaults to the CPU count.
+        """
+        self.budget = parse_memory(budget)
+        self.max_workers = max_workers if max_workers and max_workers > 0 else os.cpu_count() or 1
+
+    def map(self, func: Callable[..., Any], args: Sequence[tuple], estimates: Sequence[int]) -> list:
+        """Call ``func(*task_args)`` for every entry of ``args``, returning results in order."""
+        if len(args) != len(estimates):
+            raise ValueError("Each task needs a memory estimate")
+        results: list = [None] * len(args)
+        pending = list(range(len(args)))
+        running: dict[Future, int] = {}
+        in_use = 0
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for index in list(pending):
+                    if len(running) >= self.max_workers:
+                        break
+                    fits = in_use + estimates[index] <= self.budget
+                    if fits or not running:
+                        pending.remove(index)
+                        running[pool.submit(func, *args[index])] = index
+                        in_use += estimates[index]
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    in_use -= estimates[index]
+                    results[index] = future.result()
+        return results
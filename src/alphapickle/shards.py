@@ -0,0 +1,203 @@
+"""Deterministic sharding of many result directories across independent jobs."""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from alphapickle.metadata import AlphaFoldMetaData, detect_layout, ranked_models
+from alphapickle.probe import probe_directory, probe_file
+from alphapickle.scheduler import estimate_peak_memory
+
+INDEX_DIRNAME = "alphapickle_index"
+SUMMARY_FILENAME = "alphapickle_summary.csv"
+INVENTORY_FILENAME = "alphapickle_inventory.jsonl"
+_FRAGMENT = re.compile(r"shard-(\d+)-of-(\d+)\.jsonl")
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse ``"i/N"`` into a zero-based shard index and shard count."""
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", value)
+    if match is None:
+        raise ValueError(f"Shard must look like i/N, got {value!r}")
+    index, count = int(match.group(1)), int(match.group(2))
+    if not 0 <= index < count:
+        raise ValueError(f"Shard index must be in [0, {count}), got {index}")
+    return index, count
+
+
+def find_result_dirs(root: str | Path) -> list[Path]:
+    """Return every result directory below ``root`` in a stable, sorted order.
+
+    Once a directory is recognised, its subdirectories are not searched, so
+    AlphaFold 3 sample folders are not counted twice.
+    """
+    found = []
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames.sort()
+        try:
+            detect_layout(dirpath)
+        except FileNotFoundError:
+            continue
+        found.append(Path(dirpath))
+        dirnames[:] = []
+    return sorted(found)
+
+
+def estimate_cost(directory: Path, inventory: dict[str, dict] | None = None) -> int:
+    """Estimate the work in ``directory`` as the summed peak memory of its ranked models.
+
+    Sequence lengths come from ``inventory`` (see :func:`read_inventory`) when
+    it has an entry of matching size for a model, and are probed otherwise.
+    """
+    cost = 0
+    for _, path, _ in ranked_models(directory):
+        if path.exists():
+            cost += estimate_peak_memory(path, cached_probe(path, inventory)["n_residues"])
+    return cost
+
+
+def assign_shards(directories: Iterable[Path], n_shards: int, root: str | Path) -> list[list[Path]]:
+    """Split ``directories`` into ``n_shards`` groups of similar estimated cost.
+
+    Directories are placed largest first onto the least loaded shard, with
+    ties broken by path, so every job computes the same assignment without
+    coordination. An inventory written by :func:`write_inventory` below
+    ``root`` saves probing every model.
+    """
+    root = Path(root)
+    inventory = read_inventory(root)
+    costs = sorted(
+        (
+            (estimate_cost(directory, inventory), directory.relative_to(root).as_posix(), directory)
+            for directory in directories
+        ),
+        key=lambda item: (-item[0], item[1]),
+    )
+    shards: list[list[Path]] = [[] for _ in range(n_shards)]
+    loads = [0] * n_shards
+    for cost, _, directory in costs:
+        target = min(range(n_shards), key=lambda index: (loads[index], index))
+        shards[target].append(directory)
+        loads[target] += cost
+    return [sorted(shard) for shard in shards]
+
+
+def index_entry(obj: AlphaFoldMetaData, root: Path, directory: Path) -> dict:
+    """Summarise a processed model for the shard index.
+
+    ``directory`` is the result directory the model was found in, which for
+    AlphaFold 3 jobs is above the sample folder holding the model file.
+    """
+    return {
+        "directory": directory.relative_to(root).as_posix(),
+        "model": obj.saving_filename,
+        "source": obj.path.relative_to(root).as_posix(),
+        "n_residues": None if obj.pLDDT is None else int(len(obj.pLDDT)),
+        "mean_plddt": None if obj.pLDDT is None else float(np.mean(obj.pLDDT)),
+        "mean_pae": None if obj.PAE is None else float(np.mean(obj.PAE)),
+    }
+
+
+def write_fragment(root: str | Path, shard_index: int, n_shards: int, entries: list[dict]) -> Path:
+    """Atomically write the index fragment of one shard below ``root``."""
+    index_dir = Path(root) / INDEX_DIRNAME
+    index_dir.mkdir(exist_ok=True)
+    outfile = index_dir / f"shard-{shard_index:04d}-of-{n_shards:04d}.jsonl"
+    partial = outfile.with_suffix(".partial")
+    with open(partial, "w") as fh:
+        for entry in entries:
+            fh.write(json.dumps(entry) + "\n")
+    os.replace(partial, outfile)
+    return outfile
+
+
+def merge_shards(root: str | Path, outfile: str | Path | None = None) -> Path:
+    """Combine all shard index fragments below ``root`` into one summary CSV.
+
+    Raises:
+        FileNotFoundError: If no fragments exist, or some shards have not finished.
+    """
+    root = Path(root)
+    fragments = sorted((root / INDEX_DIRNAME).glob("shard-*-of-*.jsonl"))
+    if not fragments:
+        raise FileNotFoundError(f"No shard index fragments found in {root / INDEX_DIRNAME}")
+    counts = {int(_FRAGMENT.fullmatch(path.name).group(2)) for path in fragments}
+    if len(counts) != 1:
+        raise ValueError(f"Fragments from different shard counts found: {sorted(counts)}")
+    n_shards = counts.pop()
+    done = {int(_FRAGMENT.fullmatch(path.name).group(1)) for path in fragments}
+    missing = sorted(set(range(n_shards)) - done)
+    if missing:
+        raise FileNotFoundError(f"Missing index fragments for shards {missing} of {n_shards}")
+    entries = []
+    for path in fragments:
+        with open(path) as fh:
+            entries.extend(json.loads(line) for line in fh if line.strip())
+    outfile = Path(outfile) if outfile else root / SUMMARY_FILENAME
+    table = pd.DataFrame(entries, columns=["directory", "model", "source", "n_residues", "mean_plddt", "mean_pae"])
+    table.sort_values(["directory", "model"]).to_csv(outfile, index=False)
+    return outfile
+
+
+def build_inventory(root: str | Path) -> list[dict]:
+    """Probe every ranked model in all result directories below ``root``.
+
+    Entries are those of :func:`alphapickle.probe.probe_file` plus ``rank``, with
+    ``directory`` and ``source`` relative to ``root``.
+    """
+    root = Path(root).resolve()
+    entries = []
+    for directory in find_result_dirs(root):
+        for entry in probe_directory(directory):
+            entry["directory"] = directory.relative_to(root).as_posix()
+            entry["source"] = Path(entry["source"]).relative_to(root).as_posix()
+            entries.append(entry)
+    return entries
+
+
+def write_inventory(root: str | Path, entries: list[dict] | None = None) -> Path:
+    """Atomically write the JSON lines inventory of ``root``, building it if not given."""
+    root = Path(root)
+    entries = build_inventory(root) if entries is None else entries
+    outfile = root / INVENTORY_FILENAME
+    partial = outfile.with_suffix(".partial")
+    with open(partial, "w") as fh:
+        for entry in entries:
+            fh.write(json.dumps(entry) + "\n")
+    os.replace(partial, outfile)
+    return outfile
+
+
+def cached_probe(path: str | Path, inventory: dict[str, dict] | None = None) -> dict:
+    """Return the ``inventory`` entry for ``path``, probing it if missing or its size has changed."""
+    path = Path(path)
+    entry = (inventory or {}).get(str(path.resolve()))
+    if entry is None or entry["bytes"] != path.stat().st_size:
+        entry = probe_file(path)
+    return entry
+
+
+def find_inventory(directory: str | Path) -> dict[str, dict]:
+    """Read the inventory in ``directory`` or its nearest ancestor that has one."""
+    directory = Path(directory).resolve()
+    for parent in (directory, *directory.parents):
+        if (parent / INVENTORY_FILENAME).exists():
+            return read_inventory(parent)
+    return {}
+
+
+def read_inventory(root: str | Path) -> dict[str, dict]:
+    """Return inventory entries below ``root`` keyed by absolute source path, if an inventory exists."""
+    root = Path(root).resolve()
+    inventory = root / INVENTORY_FILENAME
+    if not inventory.exists():
+        return {}
+    with open(inventory) as fh:
+        entries = [json.loads(line) for line in fh if line.strip()]
+    return {str(root / entry["source"]): entry for entry in entries}
@@ -0,0 +1,185 @@
+"""Multi-resolution tile pyramids for large PAE matrices."""
+from __future__ import annotations
+
+from io import BytesIO
+from pathlib import Path
+import json
+import math
+import zipfile
+
+import numpy as np
+
+from alphapickle.records import PAE_MAX, quantise
+
+_REDUCERS = {"mean": np.mean, "max": np.max, "min": np.min}
+
+
+class _DirectoryWriter:
+    """Write tiles as individual files below a directory."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def write(self, name: str, payload: bytes) -> None:
+        target = self.root / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(payload)
+
+    def close(self) -> None:
+        pass
+
+
+class _ZipWriter:
+    """Write tiles as members of a single uncompressed archive."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.archive = zipfile.ZipFile(root, "w", compression=zipfile.ZIP_STORED)
+
+    def write(self, name: str, payload: bytes) -> None:
+        self.archive.writestr(name, payload)
+
+    def close(self) -> None:
+        self.archive.close()
+
+
+def _block_reduce(block: np.ndarray, reduce: str) -> np.ndarray:
+    """Downsample ``block`` by two along both axes."""
+    rows, cols = block.shape
+    if rows % 2 or cols % 2:
+        block = np.pad(block, ((0, rows % 2), (0, cols % 2)), mode="edge")
+    blocks = block.reshape(block.shape[0] // 2, 2, block.shape[1] // 2, 2)
+    return _REDUCERS[reduce](blocks, axis=(1, 3)).astype(np.float32, copy=False)
+
+
+def _encode_tile(tile: np.ndarray, fmt: str, vmin: float, vmax: float, cmap: str, dtype: np.dtype) -> bytes:
+    """Serialise a single tile to ``fmt``."""
+    buffer = BytesIO()
+    if fmt == "npy":
+        if dtype.kind == "u":
+            tile, _ = quantise(tile, dtype, PAE_MAX)
+        np.save(buffer, np.ascontiguousarray(tile, dtype=dtype))
+    else:
+        from matplotlib import image
+
+        image.imsave(buffer, tile, cmap=cmap, vmin=vmin, vmax=vmax, format="png")
+    return buffer.getvalue()
+
+
+def _write_level(
+    source: np.ndarray,
+    level: int,
+    writer: _DirectoryWriter | _ZipWriter,
+    tile_size: int,
+    fmt: str,
+    vmin: float,
+    vmax: float,
+    cmap: str,
+    reduce: str | None,
+    dtype: np.dtype,
+) -> np.ndarray | None:
+    """Write all tiles of one zoom level, optionally returning the next coarser level.
+
+    ``source`` is read in horizontal bands of ``tile_size`` rows so that a
+    memory-mapped input is streamed from disk exactly once.
+    """
+    n_rows, n_cols = source.shape
+    reduced = None
+    if reduce is not None:
+        reduced = np.empty((math.ceil(n_rows / 2), math.ceil(n_cols / 2)), dtype=np.float32)
+    for row, start in enumerate(range(0, n_rows, tile_size)):
+        band = np.asarray(source[start:start + tile_size], dtype=np.float32)
+        for col, left in enumerate(range(0, n_cols, tile_size)):
+            tile = band[:, left:left + tile_size]
+            writer.write(f"{level}/{row}_{col}.{fmt}", _encode_tile(tile, fmt, vmin, vmax, cmap, dtype))
+        if reduced is not None:
+            reduced[start // 2:start // 2 + math.ceil(band.shape[0] / 2)] = _block_reduce(band, reduce)
+    return reduced
+
+
+def write_pae_pyramid(
+    source: np.ndarray | str | Path,
+    destination: str | Path,
+    tile_size: int = 256,
+    fmt: str = "png",
+    archive: bool = False,
+    reduce: str = "mean",
+    vmin: float = 0.0,
+    vmax: float = 32.0,
+    cmap: str = "viridis",
+    dtype: np.dtype | str = np.float32,
+) -> Path:
+    """Export a PAE matrix as a zoomable pyramid of fixed-size tiles.
+
+    Level ``0`` is the coarsest view and fits in a single tile; the highest
+    level holds the matrix at full resolution. Each coarser level is built by
+    reducing 2x2 blocks of the level above, so only the full-resolution input
+    (ideally memory-mapped) and a quarter-size working copy are ever held.
+
+    Args:
+        source: PAE matrix, or path to a ``.npy`` file that is memory-mapped.
+        destination: Output directory, or archive path when ``archive`` is set.
+        tile_size: Edge length of each tile in matrix cells; must be even.
+        fmt: ``"png"`` for colour-mapped images or ``"npy"`` for raw values.
+        archive: Write a single uncompressed ZIP archive instead of a directory.
+        reduce: Block reduction used between levels: ``"mean"``, ``"max"`` or ``"min"``.
+        vmin: Lower bound of the PNG colour scale.
+        vmax: Upper bound of the PNG colour scale.
+        cmap: Matplotlib colormap name used for PNG tiles.
+        dtype: Storage dtype of ``.npy`` tiles; ``uint8``/``uint16`` quantise
+            values over 0-32 Å and record the scale in the manifest.
+
+    Returns:
+        Path to the written directory or archive.
+    """
+    if tile_size < 2 or tile_size % 2:
+        raise ValueError("tile_size must be a positive even number")
+    if fmt not in ("png", "npy"):
+        raise ValueError(f"Unsupported tile format: {fmt}")
+    if reduce not in _REDUCERS:
+        raise ValueError(f"Unsupported reduction: {reduce}")
+    dtype = np.dtype(dtype)
+    if dtype.kind not in "fu":
+        raise ValueError(f"Unsupported tile dtype: {dtype}")
+    if isinstance(source, (str, Path)):
+        source = np.load(source, mmap_mode="r")
+    if source.ndim != 2:
+        raise ValueError("PAE matrix must be two-dimensional")
+
+    destination = Path(destination)
+    writer = _ZipWriter(destination) if archive else _DirectoryWriter(destination)
+    size = max(source.shape)
+    n_levels = max(0, math.ceil(math.log2(size / tile_size))) + 1
+    try:
+        level_data = source
+        for level in reversed(range(n_levels)):
+            level_data = _write_level(
+                level_data,
+                level,
+                writer,
+                tile_size,
+                fmt,
+                vmin,
+                vmax,
+                cmap,
+                reduce if level else None,
+                dtype,
+            )
+        manifest = {
+            "shape": list(source.shape),
+            "tile_size": tile_size,
+            "levels": n_levels,
+            "format": fmt,
+            "reduce": reduce,
+            "vmin": vmin,
+            "vmax": vmax,
+            "cmap": cmap,
+        }
+        if fmt == "npy":
+            manifest["dtype"] = dtype.name
+            manifest["scale"] = PAE_MAX / np.iinfo(dtype).max if dtype.kind == "u" else 1.0
+        writer.write("manifest.json", json.dumps(manifest, indent=2).encode())
+    finally:
+        writer.close()
+    return destination
@@ -0,0 +1,198 @@
+"""Zero-copy hand-off of large arrays between worker processes.
+
+Workers write arrays into memory-mapped ``.npy`` files inside a scratch
+directory, preferably on the ``/dev/shm`` RAM disk, and send back small
+:class:`ScratchArray` handles instead of pickling the data through a pipe.
+The receiving process maps the same pages read-only.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import errno
+import os
+import shutil
+import tempfile
+import uuid
+import weakref
+
+import numpy as np
+
+_PREFIX = "alphapickle-"
+_SHARED_ATTRIBUTES = ("pLDDT", "PAE")
+# Free space required on /dev/shm before it is preferred; container defaults
+# are often only 64 MiB, less than a single large PAE matrix.
+MIN_SHM_FREE = 1 * 2**30
+# Space left free on the scratch file system after each array is stored.
+_HEADROOM = 16 * 2**20
+# Raw arrays smaller than this are cheaper to pickle than to map from a file.
+MIN_SHARED_BYTES = 64 * 2**10
+
+
+class ScratchArray:
+    """Picklable handle to an array stored in a :class:`ScratchSpace`."""
+
+    __slots__ = ("path", "shape", "dtype")
+
+    def __init__(self, path: str, shape: tuple[int, ...], dtype: str) -> None:
+        self.path = path
+        self.shape = shape
+        self.dtype = dtype
+
+    def open(self) -> np.ndarray:
+        """Map the stored array read-only into this process."""
+        return np.load(self.path, mmap_mode="r")
+
+
+def _default_root() -> str:
+    """Prefer the shared-memory file system where available and large enough."""
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK) and shutil.disk_usage(shm).free >= MIN_SHM_FREE:
+        return shm
+    return tempfile.gettempdir()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _sweep_stale(root: str) -> None:
+    """Remove scratch directories left behind by processes that no longer exist."""
+    for entry in Path(root).glob(f"{_PREFIX}*"):
+        try:
+            pid = int(entry.name[len(_PREFIX):].split("-", 1)[0])
+        except ValueError:
+            continue
+        if not _pid_alive(pid):
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+class ScratchSpace:
+    """Temporary directory of memory-mapped arrays shared between processes.
+
+    The creating process owns the directory and removes it on :meth:`close`,
+    on leaving a ``with`` block, or at interpreter exit; files from crashed
+    workers are removed with it. Directories orphaned by a killed owner are
+    swept the next time a space is created. Copies pickled to workers never
+    delete anything.
+    """
+
+    def __init__(self, root: str | Path | None = None) -> None:
+        """Create a fresh scratch directory.
+
+        Args:
+            root: Parent directory; defaults to ``/dev/shm`` or the system temp dir.
+        """
+        root = str(root) if root else _default_root()
+        _sweep_stale(root)
+        self.path = Path(tempfile.mkdtemp(prefix=f"{_PREFIX}{os.getpid()}-", dir=root))
+        self._finalizer = weakref.finalize(self, shutil.rmtree, str(self.path), True)
+
+    def __getstate__(self) -> dict:
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict) -> None:
+        self.path = state["path"]
+        self._finalizer = None
+
+    def __enter__(self) -> "ScratchSpace":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Delete the directory if this process owns it.
+
+        Arrays already mapped stay readable on POSIX systems after removal.
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def put(self, array: np.ndarray) -> ScratchArray | np.ndarray:
+        """Store ``array`` and return a handle; the file appears atomically.
+
+        If the scratch file system is too full, ``array`` is returned
+        unchanged so that it is pickled back instead.
+        """
+        array = np.asarray(array)
+        if shutil.disk_usage(self.path).free < array.nbytes + _HEADROOM:
+            return array
+        target = self.path / f"{uuid.uuid4().hex}.npy"
+        partial = target.with_suffix(".partial")
+        try:
+            with open(partial, "wb") as fh:
+                np.save(fh, array)
+        except OSError as error:
+            partial.unlink(missing_ok=True)
+            if error.errno != errno.ENOSPC:
+                raise
+            return array
+        os.replace(partial, target)
+        return ScratchArray(str(target), array.shape, array.dtype.str)
+
+
+def share_arrays(obj, space: ScratchSpace):
+    """Move the large arrays of a loaded model into ``space``.
+
+    :attr:`pLDDT` and :attr:`PAE` are always shared, as is every array of at
+    least :data:`MIN_SHARED_BYTES` in the raw ``data`` records, however deeply
+    nested (for example distogram logits and aligned confidence probabilities).
+    The same array reached twice maps to the same handle. Arrays that do not
+    fit in the scratch space stay in place and are pickled back as before.
+    """
+    handles: dict[int, ScratchArray | np.ndarray] = {}
+
+    def put(value, minimum: int = 0):
+        if id(value) in handles:
+            return handles[id(value)]
+        if not isinstance(value, np.ndarray) or value.dtype.hasobject or value.nbytes < minimum:
+            return value
+        handles[id(value)] = space.put(value)
+        return handles[id(value)]
+
+    for name in _SHARED_ATTRIBUTES:
+        if hasattr(obj, name):
+            setattr(obj, name, put(getattr(obj, name)))
+    for record in getattr(obj, "data", []):
+        _replace_nested(record, lambda value: put(value, MIN_SHARED_BYTES))
+    return obj
+
+
+def attach_arrays(obj):
+    """Replace handles created by :func:`share_arrays` with read-only memory maps."""
+    views: dict[str, np.ndarray] = {}
+
+    def convert(value):
+        if not isinstance(value, ScratchArray):
+            return value
+        if value.path not in views:
+            views[value.path] = value.open()
+        return views[value.path]
+
+    for name in _SHARED_ATTRIBUTES:
+        if hasattr(obj, name):
+            setattr(obj, name, convert(getattr(obj, name)))
+    for record in getattr(obj, "data", []):
+        _replace_nested(record, convert)
+    return obj
+
+
+def _replace_nested(container, convert) -> None:
+    """Apply ``convert`` to every leaf of nested dicts and lists, in place."""
+    if isinstance(container, dict):
+        items = container.items()
+    elif isinstance(container, list):
+        items = enumerate(container)
+    else:
+        return
+    for key, value in list(items):
+        if isinstance(value, (dict, list)):
+            _replace_nested(value, convert)
+        else:
+            container[key] = convert(value)
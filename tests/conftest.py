@@ -1,3 +1,5 @@
+import json
+import pickle
 import tarfile
 from urllib.request import urlretrieve
 
@@ -24,6 +26,27 @@ def example_data_dir(tmp_path_factory):
     return target
 
 
+@pytest.fixture
+def write_af2_dir():
+    """Return a function writing an AlphaFold 2 output directory.
+
+    It takes the directory and one result dict per model, in ranking order,
+    and writes ``ranking_debug.json`` plus a ``result_model_{i}.pkl`` per model.
+    """
+
+    def write(directory, results):
+        directory.mkdir(parents=True, exist_ok=True)
+        names = [f"model_{i}" for i in range(1, len(results) + 1)]
+        with open(directory / "ranking_debug.json", "w") as fh:
+            json.dump({"order": names}, fh)
+        for name, result in zip(names, results):
+            with open(directory / f"result_{name}.pkl", "wb") as fh:
+                pickle.dump(result, fh)
+        return directory
+
+    return write
+
+
 def pytest_configure(config):
     config.addinivalue_line("markers", "serial: mark test as running serially")
 
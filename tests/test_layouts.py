@@ -0,0 +1,103 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from alphapickle import AlphaFold3Confidences, AlphaPickleRunner, detect_layout, ranked_models
+from alphapickle.shards import find_result_dirs, merge_shards
+
+CIF_TEMPLATE = """data_model
+loop_
+_atom_site.group_PDB
+_atom_site.id
+_atom_site.label_atom_id
+_atom_site.label_comp_id
+_atom_site.label_asym_id
+_atom_site.label_seq_id
+_atom_site.auth_seq_id
+_atom_site.B_iso_or_equiv
+{rows}
+#
+"""
+
+
+def _write_af3_sample(directory, prefix, ranking_score):
+    directory.mkdir(parents=True, exist_ok=True)
+    atoms = [("A", 1), ("A", 1), ("A", 2), ("B", 1), ("B", 1), ("B", 1)]
+    rows = "\n".join(
+        f"ATOM {i} CA ALA {chain} {seq} {seq} 50.0" for i, (chain, seq) in enumerate(atoms, start=1)
+    )
+    (directory / f"{prefix}model.cif").write_text(CIF_TEMPLATE.format(rows=rows))
+    confidences = {
+        "atom_chain_ids": [chain for chain, _ in atoms],
+        "atom_plddts": [10.0, 20.0, 30.0, 40.0, 50.0, 60.0],
+        "pae": np.full((3, 3), 2.5).tolist(),
+        "token_chain_ids": ["A", "A", "B"],
+        "token_res_ids": [1, 2, 1],
+    }
+    (directory / f"{prefix}confidences.json").write_text(json.dumps(confidences, indent=1))
+    (directory / f"{prefix}summary_confidences.json").write_text(
+        json.dumps({"ptm": 0.8, "iptm": 0.7, "ranking_score": ranking_score})
+    )
+
+
+def test_af3_layout(tmp_path):
+    _write_af3_sample(tmp_path / "seed-1_sample-0", "job_seed-1_sample-0_", 0.5)
+    _write_af3_sample(tmp_path / "seed-1_sample-1", "job_seed-1_sample-1_", 0.9)
+    assert detect_layout(tmp_path) == "af3"
+    tasks = ranked_models(tmp_path)
+    assert [path.parent.name for _, path, _ in tasks] == ["seed-1_sample-1", "seed-1_sample-0"]
+    obj = AlphaFold3Confidences(tasks[0][1])
+    assert np.allclose(obj.pLDDT, [15.0, 30.0, 50.0])
+    assert obj.PAE.shape == (3, 3)
+    assert obj.scores["iptm"] == 0.7
+
+
+def test_af3_jobs_under_one_root(tmp_path):
+    for job in ("jobA", "jobB"):
+        _write_af3_sample(tmp_path / job, f"{job}_", 0.9)
+        _write_af3_sample(tmp_path / job / "seed-1_sample-0", f"{job}_seed-1_sample-0_", 0.9)
+    with pytest.raises(FileNotFoundError):
+        detect_layout(tmp_path)
+    assert find_result_dirs(tmp_path) == [tmp_path / "jobA", tmp_path / "jobB"]
+    tasks = ranked_models(tmp_path / "jobA")
+    assert [path.name for _, path, _ in tasks] == ["jobA_seed-1_sample-0_confidences.json"]
+
+
+def test_af3_shard_index_groups_by_job(tmp_path):
+    for job in ("jobA", "jobB"):
+        _write_af3_sample(tmp_path / job, f"{job}_", 0.9)
+        for sample in (0, 1):
+            _write_af3_sample(tmp_path / job / f"seed-1_sample-{sample}", f"{job}_seed-1_sample-{sample}_", 0.5)
+    AlphaPickleRunner(n_jobs=1, plot_size=1, axis_label_increment=1).process_shard(tmp_path, 0, 1)
+    summary = pd.read_csv(merge_shards(tmp_path))
+    assert sorted(summary["directory"]) == ["jobA", "jobA", "jobB", "jobB"]
+    assert summary["source"].str.contains("/seed-1_sample-").all()
+
+
+def test_colabfold_layout(tmp_path):
+    for rank in (2, 1):
+        scores = {"max_pae": 31.75, "pae": [[0.5, 1.0], [1.0, 0.5]], "plddt": [70.0 + rank, 80.0], "ptm": 0.6}
+        (tmp_path / f"job_scores_rank_00{rank}_alphafold2_ptm_model_{rank}_seed_000.json").write_text(
+            json.dumps(scores)
+        )
+    assert detect_layout(tmp_path) == "colabfold"
+    results = AlphaPickleRunner(plot_size=1, axis_label_increment=1).process_directory(tmp_path)
+    assert [obj.saving_filename for obj in results] == ["ranked_1", "ranked_2"]
+    assert results[0].scores == {"ptm": 0.6, "max_pae": 31.75}
+    assert list(pd.read_csv(tmp_path / "ranked_1_pLDDT.csv")["pLDDT"]) == [71.0, 80.0]
+    assert (tmp_path / "ranked_2_PAE.png").exists()
+
+
+def test_colabfold_multiple_queries(tmp_path):
+    scores = {"pae": [[0.5, 1.0], [1.0, 0.5]], "plddt": [70.0, 80.0], "ptm": 0.6}
+    for query in ("q1", "q2"):
+        for rank in (1, 2):
+            name = f"{query}_scores_rank_00{rank}_alphafold2_ptm_model_{rank}_seed_000.json"
+            (tmp_path / name).write_text(json.dumps(scores))
+    tasks = ranked_models(tmp_path)
+    assert [(rank, path.name[:2]) for rank, path, _ in tasks] == [(1, "q1"), (2, "q1"), (1, "q2"), (2, "q2")]
+    results = AlphaPickleRunner(plot_size=1, axis_label_increment=1).process_directory(tmp_path)
+    assert [obj.saving_filename for obj in results] == ["q1_ranked_1", "q1_ranked_2", "q2_ranked_1", "q2_ranked_2"]
+    assert (tmp_path / "q2_ranked_1_pLDDT.csv").exists()
@@ -2,9 +2,10 @@ import json
 import pickle
 
 import numpy as np
+import pandas as pd
 import pytest
 
-from alphapickle import AlphaFoldPAEJson, AlphaFoldPDB, AlphaFoldPickle, AlphaPickleRunner
+from alphapickle import AlphaFoldNpz, AlphaFoldPAEJson, AlphaFoldPDB, AlphaFoldPickle, AlphaPickleRunner
 
 
 @pytest.mark.parametrize("plot_increment", [1, 2])
@@ -49,3 +50,55 @@ def test_runner_directory(tmp_path):
     runner = AlphaPickleRunner(n_jobs=1)
     runner.process_directory(tmp_path)
     assert (tmp_path / "ranked_1_pLDDT.csv").exists()
+
+
+def test_to_record_quantised(tmp_path):
+    pickle_file = tmp_path / "result_model_1.pkl"
+    with open(pickle_file, "wb") as fh:
+        pickle.dump({"plddt": [0.0, 55.5, 100.0], "predicted_aligned_error": np.ones((3, 3))}, fh)
+    record = AlphaFoldPickle(pickle_file).to_record(pae_dtype="float16", plddt_dtype="uint8")
+    assert record.pae.dtype == np.float16
+    assert record.plddt.dtype == np.uint8
+    assert np.abs(record.plddt_values - [0.0, 55.5, 100.0]).max() <= record.plddt_scale / 2
+    assert not hasattr(record, "__dict__")
+
+
+@pytest.mark.parametrize("batch_mode", ["overlay", "grid"])
+def test_runner_directory_batch(tmp_path, batch_mode, write_af2_dir):
+    write_af2_dir(tmp_path, [{"plddt": [10, 20, 30]}] * 2)
+    runner = AlphaPickleRunner(n_jobs=1, plot_size=2, batch_mode=batch_mode)
+    runner.process_directory(tmp_path)
+    assert (tmp_path / "ranked_pLDDT.png").exists()
+    assert not (tmp_path / "ranked_1_pLDDT.csv").exists()
+    table = pd.read_csv(tmp_path / "ranked_pLDDT.csv", index_col=0)
+    assert list(table.columns) == ["ranked_1", "ranked_2"]
+
+
+def test_plddt_file_fasta_labels(tmp_path):
+    pickle_file = tmp_path / "result_model_1.pkl"
+    with open(pickle_file, "wb") as fh:
+        pickle.dump({"plddt": [10.0, 20.0, 30.0, 40.0, 50.0]}, fh)
+    fasta = tmp_path / "complex.fasta"
+    fasta.write_text(">chain_a\nMK\n>chain_b\nAC\nD\n")
+    table = pd.read_csv(AlphaFoldPickle(pickle_file, str(fasta)).write_plddt_file())
+    assert list(table["Chain"]) == ["A", "A", "B", "B", "B"]
+    assert list(table["Position"]) == [1, 2, 1, 2, 3]
+    assert "".join(table["Residue"]) == "MKACD"
+
+    fasta.write_text(">short\nMK\n")
+    with pytest.warns(UserWarning, match="does not match"):
+        table = pd.read_csv(AlphaFoldPickle(pickle_file, str(fasta)).write_plddt_file())
+    assert list(table.columns) == ["pLDDT"]
+
+
+def test_quantised_metrics_roundtrip(tmp_path):
+    rng = np.random.default_rng(0)
+    plddt = rng.uniform(0, 100, 50)
+    pae = rng.uniform(0, 31.75, (50, 50))
+    pickle_file = tmp_path / "result_model_1.pkl"
+    with open(pickle_file, "wb") as fh:
+        pickle.dump({"plddt": plddt, "predicted_aligned_error": pae}, fh)
+    outfile = AlphaFoldPickle(pickle_file).write_metrics_file()
+    loaded = AlphaFoldNpz(outfile)
+    assert np.abs(loaded.pLDDT - plddt).max() <= 100 / 255 / 2 + 1e-4
+    assert np.abs(loaded.PAE - pae).max() <= 32 / 65535 / 2 + 1e-4
@@ -0,0 +1,61 @@
+import json
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from alphapickle import AlphaFoldPickle
+from alphapickle.cli import main
+from alphapickle.metrics import summarise
+
+
+def _results(n_models):
+    return [
+        {
+            "plddt": np.array([95.0, 80.0, 60.0, 40.0]),
+            "predicted_aligned_error": np.full((4, 4), float(i)),
+            "ptm": np.float64(0.5 + i / 10),
+            "ranking_confidence": 70.0 - i,
+        }
+        for i in range(n_models)
+    ]
+
+
+def test_summarise_pickle(tmp_path, write_af2_dir):
+    write_af2_dir(tmp_path, _results(1))
+    summary = summarise(AlphaFoldPickle(tmp_path / "result_model_1.pkl"))
+    assert summary["n_residues"] == 4
+    assert summary["mean_plddt"] == pytest.approx(68.75)
+    assert [summary[f"fraction_{band}"] for band in ("very_high", "confident", "low", "very_low")] == [0.25] * 4
+    assert summary["max_pae"] == 0.0
+    assert summary["ptm"] == pytest.approx(0.5)
+    assert summary["iptm"] is None
+    assert summary["ranking_confidence"] == 70.0
+
+
+def test_cli_metrics_only(tmp_path, capsys, write_af2_dir):
+    write_af2_dir(tmp_path, _results(3))
+    main(["-od", str(tmp_path), "--metrics_only"])
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line["model"] for line in lines] == ["ranked_1", "ranked_2", "ranked_3"]
+    assert [line["mean_pae"] for line in lines] == [0.0, 1.0, 2.0]
+    assert not list(tmp_path.glob("*.png")) and not list(tmp_path.glob("*.csv"))
+
+
+def test_cli_metrics_file_alongside_plots(tmp_path, write_af2_dir):
+    write_af2_dir(tmp_path, _results(1))
+    metrics_file = tmp_path / "metrics.jsonl"
+    main(["-pf", str(tmp_path / "result_model_1.pkl"), "-mf", str(metrics_file), "-ps", "1", "-pi", "1"])
+    assert json.loads(metrics_file.read_text())["model"] == "result_model_1"
+    assert (tmp_path / "result_model_1_pLDDT.png").exists()
+
+
+def test_metrics_only_skips_matplotlib(tmp_path, write_af2_dir):
+    write_af2_dir(tmp_path, _results(1))
+    code = (
+        "import sys; from alphapickle.cli import main; "
+        f"main(['-od', {str(tmp_path)!r}, '-mo', '-mf', {str(tmp_path / 'm.jsonl')!r}]); "
+        "assert 'matplotlib' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
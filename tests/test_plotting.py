@@ -0,0 +1,49 @@
+import gc
+
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import RendererAgg
+
+from alphapickle.plotting import DPI, _plddt_segments, _template, clear_templates, render_pae, render_plddt
+
+
+def test_plddt_segments_envelope():
+    plddt = np.r_[np.full(50, 80.0), 5.0, np.full(49, 90.0)]
+    segments, values = _plddt_segments(plddt, max_points=10)
+    assert len(segments) == 10 + 9
+    assert segments[:, :, 1].min() == 5.0
+    assert segments[:, :, 1].max() == 90.0
+    assert len(values) == len(segments)
+    full, _ = _plddt_segments(plddt[:5], max_points=10)
+    assert full.shape == (4, 2, 2)
+
+
+@pytest.mark.parametrize("style", ["scatter", "line"])
+def test_render_plddt_styles(tmp_path, style):
+    plddt = np.random.default_rng(0).uniform(0, 100, 2000)
+    outfile = render_plddt(plddt, tmp_path / f"{style}.png", size_in_inches=1, axis_label_increment=500, style=style)
+    assert outfile.stat().st_size > 0
+
+
+def test_templates_reused_between_renders(tmp_path):
+    clear_templates()
+    rng = np.random.default_rng(0)
+    render_pae(rng.uniform(0, 32, (30, 30)), tmp_path / "a.png", 2, 10)
+    template = _template("pae", 2)
+    render_pae(rng.uniform(0, 5, (12, 12)), tmp_path / "b.png", 2, 5)
+    assert _template("pae", 2) is template
+    assert template.ax.get_xlim() == (-0.5, 11.5)
+    assert list(template.ax.get_yticks()) == [0, 5, 10]
+    assert template.artist.get_array().shape == (1, 1)
+    clear_templates()
+    assert _template("pae", 2) is not template
+
+
+def test_templates_release_renderer(tmp_path):
+    clear_templates()
+    render_pae(np.zeros((5, 5)), tmp_path / "a.png", 1, 1)
+    render_plddt(np.zeros(5), tmp_path / "b.png", 1, 1)
+    gc.collect()
+    renderers = [obj for obj in gc.get_objects() if isinstance(obj, RendererAgg)]
+    # Only idle-resolution renderers survive, never the one used for saving.
+    assert renderers and all(renderer.width < DPI for renderer in renderers)
@@ -0,0 +1,126 @@
+import json
+import pickle
+import types
+
+import numpy as np
+import pytest
+
+from alphapickle import probe_file
+from alphapickle.cli import main
+from alphapickle.shards import INVENTORY_FILENAME, read_inventory
+
+PDB_ATOMS = (
+    "ATOM      1  N   ALA A   1       0.000   0.000   0.000  1.00 10.00           N\n"
+    "ATOM      2  CA  ALA A   1       0.000   0.000   0.000  1.00 10.00           C\n"
+    "ATOM      3  CA  ALA A   2       1.000   1.000   1.000  1.00 20.00           C\n"
+    "ATOM      4  CA  GLY B   1       1.000   1.000   1.000  1.00 30.00           C\n"
+    "TER\nEND\n"
+)
+CIF = """data_model
+#
+_entity_poly_seq.entity_id 1
+_entity_poly_seq.num 1
+_entity_poly_seq.mon_id ALA
+#
+loop_
+_entity_poly_seq.entity_id
+_entity_poly_seq.num
+_entity_poly_seq.mon_id
+2 1 ALA
+2 2 GLY
+2 3 SER
+#
+loop_
+_struct_asym.id
+_struct_asym.entity_id
+A 1
+B 2
+C 2
+D 3
+#
+loop_
+_atom_site.group_PDB
+_atom_site.id
+"""
+
+
+@pytest.mark.parametrize("protocol", [2, 4, 5])
+def test_probe_pickle_arrays(tmp_path, protocol):
+    data = {
+        "distogram": {"logits": np.zeros((7, 7, 64), dtype=np.float32)},
+        "plddt": np.zeros(7),
+        "predicted_aligned_error": np.zeros((7, 7)),
+        "ptm": np.float64(0.5),
+    }
+    path = tmp_path / "result_model_1.pkl"
+    with open(path, "wb") as fh:
+        pickle.dump(data, fh, protocol=protocol)
+    entry = probe_file(path)
+    assert entry["format"] == "pickle"
+    assert entry["n_residues"] == 7
+    assert entry["metrics"] == ["pae", "plddt", "ptm"]
+
+
+def test_probe_pickle_lists(tmp_path):
+    path = tmp_path / "result_model_1.pkl"
+    with open(path, "wb") as fh:
+        pickle.dump({"plddt": [80.0] * 1500}, fh)
+    assert probe_file(path)["n_residues"] == 1500
+
+
+@pytest.mark.parametrize("seqres", ["", "SEQRES   1 A    5  ALA ALA ALA ALA ALA\nSEQRES   1 B    3  GLY GLY GLY\n"])
+def test_probe_pdb(tmp_path, seqres):
+    path = tmp_path / "model.pdb"
+    path.write_text(seqres + PDB_ATOMS)
+    entry = probe_file(path)
+    assert entry["n_residues"] == (8 if seqres else 3)
+    assert entry["metrics"] == ["plddt"]
+
+
+def test_probe_mmcif_header(tmp_path):
+    path = tmp_path / "model.cif"
+    path.write_text(CIF)
+    # One residue for chain A, three each for B and C, one for the ligand chain D.
+    assert probe_file(path)["n_residues"] == 8
+
+
+def test_probe_json_formats(tmp_path):
+    colabfold = tmp_path / "x_scores_rank_001.json"
+    colabfold.write_text(json.dumps({"plddt": [1.0] * 4, "pae": np.zeros((4, 4)).tolist(), "ptm": 0.5}))
+    assert probe_file(colabfold)["n_residues"] == 4
+    assert probe_file(colabfold)["metrics"] == ["pae", "plddt", "ptm"]
+    legacy = tmp_path / "pae.json"
+    legacy.write_text(json.dumps([{"residue1": [1, 1, 2, 2], "residue2": [1, 2, 1, 2], "distance": [0] * 4}]))
+    assert probe_file(legacy)["n_residues"] == 2
+    with pytest.raises(ValueError):
+        probe_file(tmp_path / "model.txt")
+
+
+def test_probe_json_af3(tmp_path):
+    path = tmp_path / "fold_x_confidences.json"
+    path.write_text(
+        json.dumps({"atom_chain_ids": ["A"] * 9, "atom_plddts": [1.0] * 9, "pae": np.zeros((3, 3)).tolist(), "token_res_ids": [1, 2, 3]})
+    )
+    (tmp_path / "fold_x_summary_confidences.json").write_text(json.dumps({"ptm": 0.5, "iptm": 0.4, "ranking_score": 0.6}))
+    entry = probe_file(path)
+    assert entry["n_residues"] == 3
+    assert entry["metrics"] == ["iptm", "pae", "plddt", "ptm", "ranking_confidence"]
+
+
+def test_cli_probe_inventory(tmp_path, capsys, write_af2_dir):
+    directory = write_af2_dir(
+        tmp_path / "target", [{"plddt": np.zeros(12), "predicted_aligned_error": np.zeros((12, 12))}] * 2
+    )
+    main(["--probe", str(tmp_path)])
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(line["directory"], line["rank"], line["n_residues"]) for line in lines] == [("target", 1, 12), ("target", 2, 12)]
+    assert (tmp_path / INVENTORY_FILENAME).exists()
+    inventory = read_inventory(tmp_path)
+    assert inventory[str((directory / "result_model_1.pkl").resolve())]["metrics"] == ["pae", "plddt"]
+
+
+def test_probe_submodule_not_shadowed():
+    import alphapickle.probe as module
+
+    assert isinstance(module, types.ModuleType)
+    assert module.probe_file is probe_file
@@ -0,0 +1,77 @@
+import multiprocessing
+import os
+import pickle
+import time
+
+import pytest
+
+from alphapickle import AlphaPickleRunner, probe_file
+from alphapickle.scheduler import MemoryBudgetScheduler, estimate_peak_memory, parse_memory
+from alphapickle.shards import write_inventory
+
+
+ESTIMATES = [60, 60, 30, 30]
+
+
+def _tracked(index, running, starts, lock):
+    with lock:
+        starts.append((index, list(running)))
+        running.append(index)
+    if index == 0:
+        # Only returns once task 2 has been admitted alongside task 0.
+        deadline = time.monotonic() + 30
+        while 2 not in [started for started, _ in starts] and time.monotonic() < deadline:
+            time.sleep(0.01)
+    with lock:
+        running.remove(index)
+    return index
+
+
+@pytest.mark.parametrize("value, expected", [("8G", 8 * 2**30), ("512MiB", 512 * 2**20), (1024, 1024)])
+def test_parse_memory(value, expected):
+    assert parse_memory(value) == expected
+
+
+def test_scheduler_respects_budget():
+    scheduler = MemoryBudgetScheduler(budget=100, max_workers=4)
+    with multiprocessing.Manager() as manager:
+        running, starts, lock = manager.list(), manager.list(), manager.Lock()
+        results = scheduler.map(_tracked, [(i, running, starts, lock) for i in range(4)], ESTIMATES)
+        starts = list(starts)
+    assert results == [0, 1, 2, 3]
+    # 2 fits next to 0 and is admitted ahead of 1, which does not.
+    order = [index for index, _ in starts]
+    assert order.index(2) < order.index(1)
+    for index, others in starts:
+        assert sum(ESTIMATES[other] for other in others) + ESTIMATES[index] <= 100
+
+
+def test_runner_memory_budget(tmp_path, write_af2_dir):
+    write_af2_dir(tmp_path, [{"plddt": [10, 20]}] * 2)
+    assert estimate_peak_memory(tmp_path / "result_model_1.pkl", n_residues=2) < parse_memory("1G")
+    runner = AlphaPickleRunner(n_jobs=2, plot_size=1, axis_label_increment=1, memory_budget="1G")
+    results = runner.process_directory(tmp_path)
+    assert [obj.saving_filename for obj in results] == ["ranked_1", "ranked_2"]
+    assert (tmp_path / "ranked_2_pLDDT.csv").exists()
+
+
+def test_runner_budget_reads_inventory(tmp_path, monkeypatch, write_af2_dir):
+    directory = write_af2_dir(tmp_path / "target", [{"plddt": [10, 20]}] * 2)
+    write_inventory(tmp_path)
+    with open(directory / "result_model_2.pkl", "wb") as fh:
+        pickle.dump({"plddt": [10, 20, 30]}, fh)
+    probed = []
+    monkeypatch.setattr("alphapickle.shards.probe_file", lambda path: probed.append(path.name) or probe_file(path))
+    AlphaPickleRunner(n_jobs=1, plot_size=1, axis_label_increment=1, memory_budget="1G").process_directory(directory)
+    assert probed == ["result_model_2.pkl"]
+
+
+def test_runner_budget_defaults_to_cpu_count(tmp_path, monkeypatch, write_af2_dir):
+    write_af2_dir(tmp_path, [])
+    created = []
+    monkeypatch.setattr(
+        "alphapickle.runner.MemoryBudgetScheduler",
+        lambda budget, max_workers: created.append(MemoryBudgetScheduler(budget, max_workers)) or created[-1],
+    )
+    AlphaPickleRunner(memory_budget="1G").process_directory(tmp_path)
+    assert created[0].max_workers == (os.cpu_count() or 1)
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from alphapickle.cli import main
+from alphapickle.shards import assign_shards, find_result_dirs, parse_shard
+
+
+def _results(n_models, n_residues):
+    return [{"plddt": [50.0] * n_residues} for _ in range(n_models)]
+
+
+def test_assign_shards_balanced(tmp_path, write_af2_dir):
+    write_af2_dir(tmp_path / "big", _results(4, 500))
+    for name in ("a", "b", "c"):
+        write_af2_dir(tmp_path / "small" / name, _results(1, 500))
+    dirs = find_result_dirs(tmp_path)
+    assert len(dirs) == 4
+    shards = assign_shards(dirs, 2, tmp_path)
+    assert shards == assign_shards(list(reversed(dirs)), 2, tmp_path)
+    assert shards[0] == [tmp_path / "big"]
+    assert len(shards[1]) == 3
+
+
+@pytest.mark.parametrize("value", ["2/2", "1", "-1/2"])
+def test_parse_shard_invalid(value):
+    with pytest.raises(ValueError):
+        parse_shard(value)
+
+
+def test_shards_as_processes(tmp_path, write_af2_dir):
+    for name in ("a", "b", "c"):
+        write_af2_dir(tmp_path / name, _results(2, 3))
+    for index in range(2):
+        subprocess.run(
+            [sys.executable, "-m", "alphapickle.cli", "-od", str(tmp_path), "--shard", f"{index}/2",
+             "-ps", "1", "-pi", "1"],
+            check=True,
+            capture_output=True,
+        )
+    main(["-ms", str(tmp_path)])
+    summary = pd.read_csv(tmp_path / "alphapickle_summary.csv")
+    assert len(summary) == 6
+    assert sorted(set(summary["directory"])) == ["a", "b", "c"]
+    assert (tmp_path / "b" / "ranked_2_pLDDT.csv").exists()
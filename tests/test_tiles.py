@@ -0,0 +1,38 @@
+import json
+import zipfile
+
+import numpy as np
+
+from alphapickle import AlphaFoldPAEJson
+from alphapickle.tiles import write_pae_pyramid
+
+
+def test_pyramid_levels_from_memmap(tmp_path):
+    pae = np.arange(10 * 10, dtype=np.float32).reshape(10, 10)
+    source = tmp_path / "pae.npy"
+    np.save(source, pae)
+    out = write_pae_pyramid(source, tmp_path / "tiles", tile_size=4, fmt="npy")
+    manifest = json.loads((out / "manifest.json").read_text())
+    assert manifest["levels"] == 3
+    assert np.array_equal(np.load(out / "2" / "0_0.npy"), pae[:4, :4])
+    assert np.load(out / "2" / "2_2.npy").shape == (2, 2)
+    assert np.allclose(np.load(out / "1" / "0_0.npy"), pae[:8, :8].reshape(4, 2, 4, 2).mean(axis=(1, 3)))
+    assert np.load(out / "0" / "0_0.npy").shape == (3, 3)
+
+
+def test_pyramid_archive(tmp_path):
+    json_file = tmp_path / "pae.json"
+    json_file.write_text(json.dumps({"predicted_aligned_error": np.eye(6).tolist()}))
+    out = AlphaFoldPAEJson(json_file).write_pae_tiles(tile_size=4, archive=True)
+    with zipfile.ZipFile(out) as archive:
+        names = set(archive.namelist())
+    assert {"manifest.json", "0/0_0.png", "1/1_1.png"} <= names
+
+
+def test_pyramid_quantised_tiles(tmp_path):
+    pae = np.linspace(0, 31.75, 16, dtype=np.float32).reshape(4, 4)
+    out = write_pae_pyramid(pae, tmp_path / "tiles", tile_size=4, fmt="npy", dtype="uint8")
+    manifest = json.loads((out / "manifest.json").read_text())
+    codes = np.load(out / "0" / "0_0.npy")
+    assert codes.dtype == np.uint8
+    assert np.abs(codes * manifest["scale"] - pae).max() <= manifest["scale"] / 2 + 1e-6
@@ -0,0 +1,67 @@
+import pickle
+from collections import namedtuple
+from types import SimpleNamespace
+
+import numpy as np
+from joblib import Parallel, delayed
+
+from alphapickle import AlphaPickleRunner, transport
+from alphapickle.transport import ScratchArray, ScratchSpace, attach_arrays, share_arrays
+
+
+def _make_array(space, n):
+    return space.put(np.full((n, n), n, dtype=np.float32))
+
+
+def test_scratch_space_roundtrip(tmp_path):
+    with ScratchSpace(tmp_path) as space:
+        handles = Parallel(n_jobs=2)(delayed(_make_array)(space, n) for n in (2, 3))
+        assert all(isinstance(handle, ScratchArray) for handle in handles)
+        view = handles[1].open()
+        assert isinstance(view, np.memmap)
+        assert view.shape == (3, 3) and view[0, 0] == 3
+    assert not space.path.exists()
+    assert view.sum() == 27
+
+
+def test_runner_shared_memory(tmp_path, write_af2_dir):
+    write_af2_dir(tmp_path, [{"plddt": np.array([10.0, 20.0]), "predicted_aligned_error": np.ones((2, 2))}] * 2)
+    runner = AlphaPickleRunner(n_jobs=2, plot_size=1, axis_label_increment=1, share_memory=True)
+    results = runner.process_directory(tmp_path)
+    assert isinstance(results[0].PAE, np.memmap)
+    assert isinstance(results[0].pLDDT, np.memmap)
+    assert results[0].PAE is results[0].data[0]["predicted_aligned_error"]
+    assert np.array_equal(results[1].pLDDT, [10.0, 20.0])
+    sequential = AlphaPickleRunner(n_jobs=1, plot_size=1, axis_label_increment=1, share_memory=True)
+    assert not isinstance(sequential.process_directory(tmp_path)[0].PAE, np.memmap)
+
+
+def test_share_arrays_nested_data(tmp_path):
+    pae = np.ones((4, 4))
+    logits = np.zeros((128, 128, 4), dtype=np.float32)
+    obj = SimpleNamespace(
+        pLDDT=np.zeros(4),
+        PAE=pae,
+        data=[{"predicted_aligned_error": pae, "distogram": {"logits": logits}, "msa": np.zeros(8)}],
+    )
+    with ScratchSpace(tmp_path) as space:
+        share_arrays(obj, space)
+        assert len(list(space.path.iterdir())) == 3
+        assert obj.data[0]["predicted_aligned_error"] is obj.PAE
+        assert isinstance(obj.data[0]["distogram"]["logits"], ScratchArray)
+        assert isinstance(obj.data[0]["msa"], np.ndarray)
+        pickle.loads(pickle.dumps(obj))
+        attach_arrays(obj)
+    assert obj.data[0]["predicted_aligned_error"] is obj.PAE
+    assert isinstance(obj.data[0]["distogram"]["logits"], np.memmap)
+
+
+def test_put_falls_back_when_full(tmp_path, monkeypatch):
+    usage = namedtuple("usage", "total used free")
+    with ScratchSpace(tmp_path) as space:
+        monkeypatch.setattr(transport.shutil, "disk_usage", lambda path: usage(64 * 2**20, 64 * 2**20, 2**20))
+        array = np.ones((600, 600))
+        assert space.put(array) is array
+        assert not list(space.path.iterdir())
+    monkeypatch.setattr(transport.os, "access", lambda path, mode: True)
+    assert transport._default_root() != "/dev/shm"